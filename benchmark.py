@@ -0,0 +1,235 @@
+# Program purpose: Benchmark the integration, linear and nonlinear_system solvers, and save the results as JSON.
+#
+# Every problem is generated from fixed formulas (and a fixed random seed), so two runs on different versions
+# of the code solve exactly the same problems and can be compared:
+#   python benchmark.py --output before.json
+#   ... change the code ...
+#   python benchmark.py --output after.json --compare before.json
+#
+# For each solver and problem size it records:
+#   seconds - the best wall time over the repeats
+#   evaluations - calls to the integrand / system of equations (None for the linear solvers)
+#   iterations - solver iterations (None for the fixed rules)
+#   peak_bytes - the peak memory allocated during one extra, traced run
+#   error - distance from a reference answer
+#
+# Problems:
+#   decay - the integrand the sweep drivers use, 0.04*exp(-lam*x)*(1+x)**-0.5, on [0, 10] and on [0, inf).
+#           On [0, inf) the rules are extended with the doubling tail (see integration/tail.py).
+#   dense / sparse - strictly diagonally dominant linear systems: a random dense one, and the shifted
+#                    5 point Laplacian (see linear/sparsebench.py), of growing size.
+#   market / cournot - the market and duopoly examples of nonlinear_system/newtonexample.py, scaled up:
+#                      many independent markets, and a market with many Cournot competitors.
+
+# Necessary Libraries:
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import datetime
+import tracemalloc
+import contextlib
+import importlib
+import numpy as np
+import scipy
+import scipy.integrate
+import scipy.sparse
+import scipy.sparse.linalg
+
+# The solvers are scripts in their own folders, which import their neighbours by name
+here = os.path.dirname(os.path.abspath(__file__))
+for folder in ['common', 'integration', 'linear', 'nonlinear_system']:
+    sys.path.insert(0, os.path.join(here, folder))
+
+from simpson import Simp
+from trapezoid import Tz
+from gaussleg import Gl
+from gausscheb import Gc
+from nodes import legnodes
+from tail import doubling
+from history import History
+from sparsebench import poisson
+from newtonraphson import NR
+
+# The solver files have dashes in their names, so they are loaded with importlib
+gj = importlib.import_module('gauss-jacobi').gj
+gs = importlib.import_module('gauss-seidel').gs
+
+
+def counted(f):
+    # Wrap a function so the number of calls is counted in calls[0]
+    calls = [0]
+
+    def g(*args):
+        calls[0] = calls[0] + 1
+        return f(*args)
+    return g, calls
+
+
+def measure(run, repeats):
+    # Run a benchmark repeats times, keep the best time, then once more under tracemalloc for the peak memory.
+    # run() returns a dictionary with the evaluations, iterations and error of one run. Output is silenced.
+    best = np.inf
+    for i in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    out['seconds'] = best
+    out['peak_bytes'] = peak
+    return out
+
+
+######################################## Problems ########################################
+
+def decay(x, args):
+    # The integrand used by the sweep drivers
+    return args[0]*np.exp(-args[1]*x)*(1+x)**(-args[2])
+
+
+def denseproblem(n, seed=0):
+    # A random strictly diagonally dominant system
+    rng = np.random.default_rng(seed)
+    coef = rng.uniform(-1, 1, (n, n))
+    np.fill_diagonal(coef, abs(coef).sum(axis=1) + 1)
+    return coef, rng.uniform(-1, 1, n)
+
+
+def markets(k):
+    # k independent copies of the market in newtonexample.py, each with its own demand intercept.
+    # The unknowns are [P_1, Q_1, P_2, Q_2, ...].
+    a = np.linspace(1500, 2500, k)
+
+    def F(X):
+        p = X[0::2]
+        q = X[1::2]
+        system = np.zeros(len(X))
+        system[0::2] = 20*(1.5**(q/100)) - p
+        system[1::2] = (a - q)**0.7 - p
+        return system
+    return F, np.zeros(2*k)
+
+
+def cournot(k):
+    # k competitors, each reacting to the total output of the others, with a small quadratic cost
+    a = np.linspace(4, 7, k)
+
+    def F(Q):
+        others = (np.sum(Q) - Q) / max(k - 1, 1)
+        return a - Q - 0.5*others - 0.01*Q**2
+    return F, np.zeros(k)
+
+
+######################################## Benchmarks ########################################
+
+def integration(repeats):
+    results = []
+    args = np.array([0.04, 1.0, 0.5])
+    for upper in [10, np.inf]:
+        exact = scipy.integrate.quad(decay, 0, upper, args=(args,), epsabs=1e-14, epsrel=1e-13)[0]
+        problem = 'decay [0, ' + str(upper) + ']'
+
+        rules = [('Simp', [100, 1000, 10000], lambda f, a, b, n: Simp(f, a, b, n, args)),
+                 ('Tz', [100, 1000, 10000], lambda f, a, b, n: Tz(f, a, b, n, args)),
+                 ('Gl', [10, 50, 200], lambda f, a, b, n: Gl(f, a, b, legnodes(n)[0], legnodes(n)[1], args)),
+                 ('Gc', [10, 50, 200], lambda f, a, b, n: Gc(f, a, b, n, args))]
+        for name, sizes, rule in rules:
+            for n in sizes:
+                def run():
+                    f, calls = counted(decay)
+                    if np.isinf(upper):
+                        value = doubling(lambda a, b: rule(f, a, b, n), 0)
+                    else:
+                        value = rule(f, 0, upper, n)
+                    return {'evaluations': calls[0], 'iterations': None, 'error': abs(value - exact)}
+                results.append(dict(solver=name, problem=problem, size=n, **measure(run, repeats)))
+    return results
+
+
+def linear(repeats):
+    results = []
+    problems = [('dense', n, denseproblem(n)) for n in [100, 400, 1000]]
+    for m in [10, 30, 100]:
+        coef = poisson(m)
+        problems.append(('sparse', m*m, (coef, np.ones(m*m))))
+
+    for problem, n, (coef, cons) in problems:
+        exact = scipy.sparse.linalg.spsolve(scipy.sparse.csc_matrix(coef), cons)
+        for name, solver in [('gj', gj), ('gs', gs)]:
+            def run():
+                output = History(5000, ["Iteration #", "Euclidean Norm"])
+                x = solver(coef, cons, np.zeros(n), 5000, 1e-10, history=output)
+                return {'evaluations': None, 'iterations': output.count, 'error': float(np.max(abs(x - exact)))}
+            results.append(dict(solver=name, problem=problem, size=n, **measure(run, repeats)))
+    return results
+
+
+def nonlinear(repeats):
+    results = []
+    cases = [('market', k, markets(k)) for k in [1, 10, 50]] + [('cournot', k, cournot(k)) for k in [3, 30, 100]]
+    for problem, k, (F, init) in cases:
+        # numdifftools is only used on the small problems, it takes far more evaluations of F
+        for jac in ['forward', None]:
+            if jac is None and len(init) > 10:
+                continue
+            def run():
+                stats = {}
+                Fc, calls = counted(F)
+                solution = NR(Fc, init, history=False, jac=jac, stats=stats)[0]
+                return {'evaluations': calls[0], 'iterations': stats['iterations'],
+                        'error': float(np.linalg.norm(F(solution)))}
+            name = 'NR (' + ('numdifftools' if jac is None else jac) + ')'
+            results.append(dict(solver=name, problem=problem, size=len(init), **measure(run, repeats)))
+    return results
+
+
+def compare(results, old):
+    # Print the time of each benchmark against the same benchmark in an older run
+    before = {(r['solver'], r['problem'], r['size']): r for r in old['results']}
+    print("\n%-22s %-16s %7s %12s %12s %8s" % ("Solver", "Problem", "Size", "Before (s)", "After (s)", "Ratio"))
+    for r in results:
+        key = (r['solver'], r['problem'], r['size'])
+        if key in before:
+            print("%-22s %-16s %7d %12.5f %12.5f %8.2f" % (key + (before[key]['seconds'], r['seconds'],
+                                                               r['seconds'] / before[key]['seconds'])))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the solvers and save the results as JSON.")
+    parser.add_argument('--output', default='benchmark.json', help="where to write the results")
+    parser.add_argument('--repeats', type=int, default=3, help="timed runs per benchmark, the best is kept")
+    parser.add_argument('--only', choices=['integration', 'linear', 'nonlinear'], help="run one group only")
+    parser.add_argument('--compare', help="an earlier results file to compare against")
+    options = parser.parse_args()
+
+    groups = {'integration': integration, 'linear': linear, 'nonlinear': nonlinear}
+    results = []
+    for group, bench in groups.items():
+        if options.only is None or options.only == group:
+            print("Running the " + group + " benchmarks")
+            results = results + bench(options.repeats)
+
+    report = {'created': datetime.datetime.now().isoformat(),
+              'python': platform.python_version(),
+              'numpy': np.__version__,
+              'scipy': scipy.__version__,
+              'platform': platform.platform(),
+              'repeats': options.repeats,
+              'results': results}
+    with open(options.output, 'w') as out:
+        json.dump(report, out, indent=1)
+    print("Results written to " + options.output)
+
+    if options.compare is not None:
+        with open(options.compare) as old:
+            compare(results, json.load(old))
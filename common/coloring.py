@@ -0,0 +1,28 @@
+# Program purpose: Greedy graph coloring, shared by the multicolor Gauss - Seidel split (linear/blocksplit.py) and the
+# colored finite difference Jacobian (nonlinear_system/jacobian.py).
+#
+# The graph is given as a square sparse (or dense) matrix: vertices i and j are joined when entry (i, j) is nonzero.
+# Each vertex, in order, gets the smallest color not already used by a neighbor, so joined vertices never share a color.
+
+# Necessary Libraries:
+import numpy as np
+import scipy.sparse
+
+
+def greedycolor(graph):
+    # Inputs:
+    # graph - a square matrix, nonzero at (i, j) when vertices i and j may not share a color. It should be symmetric.
+    # Output:
+    # colors - a vector with the color (0, 1, 2, ...) of every vertex
+    ###################################################
+    graph = scipy.sparse.csr_matrix(graph)
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    colors = [-1] * graph.shape[0]
+    for i in range(graph.shape[0]):
+        used = set(colors[j] for j in indices[indptr[i]:indptr[i + 1]] if j != i)
+        c = 0
+        while c in used:
+            c = c + 1
+        colors[i] = c
+    return np.array(colors)
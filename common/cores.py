@@ -0,0 +1,15 @@
+# Program purpose: The number of cores available, used as the default number of workers by the parallel solvers
+# (integration/parallel.py and linear/blocksplit.py).
+
+# Necessary Libraries:
+import os
+
+
+def cores():
+    # Output:
+    # the number of cores this process is allowed to run on
+    ###################################################
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
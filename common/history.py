@@ -0,0 +1,60 @@
+# Program purpose: Record the iteration history of a solver without copying it on every iteration.
+#
+# The rows are written into an array that is allocated once, sized to the maximum number of iterations.
+# Each row can also be sent to a callback as soon as it is recorded. To stream rows into a generator,
+# prime the generator with next() and pass its send method as the callback.
+# The pandas table is only built when table() is called.
+# A History passed to a solver is reset at the start of the run, so the same one can be reused for many runs.
+# The reset also replaces its callback with the callback given to the solver (None if it is not given).
+# If the run is longer than maxrows, the array is made larger.
+# There is one copy, in the common folder, which must be on sys.path. benchmark.py and the bench and example
+# scripts put it there; scripts of your own that import the solvers should do the same.
+
+# Necessary Libraries:
+import numpy as np
+import pandas as pd
+
+
+class History:
+    # Arguments are:
+    # maxrows - the maximum number of rows that will be recorded (usually maxiter).
+    # columns - a list of column names.
+    # record - optional. If False, rows are not stored, they are only sent to the callback. Default is True.
+    # callback - optional. A function called with each row as it is recorded. Default is None.
+
+    def __init__(self, maxrows, columns, record=True, callback=None):
+        self.columns = list(columns)
+        self.callback = callback
+        self.count = 0
+        if record:
+            self.rows = np.empty((maxrows, len(self.columns)))
+        else:
+            self.rows = None
+
+    def reset(self, callback=None):
+        # Start a new run: forget the recorded rows, and send rows to callback from now on (None for no callback)
+        self.count = 0
+        self.callback = callback
+
+    def add(self, row):
+        # Store the row in the next free slot, and pass it on to the callback
+        if self.rows is not None:
+            if self.count == len(self.rows):
+                # Out of room: double the size of the array
+                self.rows = np.concatenate([self.rows, np.empty((max(len(self.rows), 1), len(self.columns)))])
+            self.rows[self.count] = row
+        self.count = self.count + 1
+        if self.callback is not None:
+            self.callback(row)
+
+    def array(self):
+        # The recorded rows, as a view of the preallocated array
+        if self.rows is None:
+            return None
+        return self.rows[:self.count]
+
+    def table(self):
+        # Build the pandas table of the recorded rows
+        if self.rows is None:
+            return None
+        return pd.DataFrame(data=self.array(), columns=self.columns)
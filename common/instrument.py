@@ -0,0 +1,162 @@
+# Program purpose: Opt-in instrumentation of the solvers. For every call of a solver it records the number of calls to
+# the user's function, the time spent in each phase of the solver, the number of iterations and the convergence rate.
+#
+# Instrumentation is off until a sink is switched on:
+#     stats = instrument.Memory()
+#     with instrument.recording(stats):
+#         solution = gs(coef, cons, inx, 500, 1e-8)
+#     print(stats.totals())
+# Each solver call then sends one record (a dictionary) to every sink. A sink is any function that takes a record:
+#   Memory - keeps the records in a list, and can add them up per solver.
+#   JSONLines(path) - appends each record to a file, as one line of JSON.
+#   or any other function, as a callback.
+# While no sink is switched on, start() returns None and the solvers skip all of the bookkeeping,
+# so the cost is one check per phase.
+#
+# A record looks like:
+#   {'solver': 'NR', 'seconds': 0.01, 'calls': 42, 'call seconds': 0.002, 'iterations': 5, 'rate': 0.01,
+#    'phases': {'residual': 0.001, 'jacobian': 0.006, 'solve': 0.002, 'history': 0.0001, 'step': 0.0001}}
+# 'calls' counts the calls to the user's function (the integrand, or the system of equations), and 'call seconds'
+# is the time spent inside them. 'rate' is the average factor the norm fell by on each iteration.
+# There is one copy, in the common folder, which must be on sys.path. benchmark.py and the bench and example
+# scripts put it there; scripts of your own that import the solvers should do the same.
+
+# Necessary Libraries:
+import time
+import json
+import contextlib
+
+# The sinks that are switched on
+sinks = []
+
+
+class Probe:
+    # The measurements of one solver call. Made by start(), and sent to the sinks by finish().
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.calls = 0
+        self.callseconds = 0.0
+        self.iterations = 0
+        self.first = None
+        self.norm = None
+        self.phases = {}
+        self.begin = time.perf_counter()
+        self.last = self.begin
+
+    def wrap(self, f):
+        # Wrap the user's function so its calls are counted and timed
+        def g(*args):
+            start = time.perf_counter()
+            try:
+                return f(*args)
+            finally:
+                self.calls = self.calls + 1
+                self.callseconds = self.callseconds + time.perf_counter() - start
+        return g
+
+    def lap(self, phase):
+        # Charge the time since the last lap to the given phase
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def iterate(self, norm):
+        # Count an iteration, and keep the norms needed for the convergence rate
+        self.iterations = self.iterations + 1
+        if self.first is None:
+            self.first = float(norm)
+        self.norm = float(norm)
+
+    def finish(self, phase=None):
+        # Charge the last phase (if given), then send the record to every sink
+        if phase is not None:
+            self.lap(phase)
+        rate = None
+        if self.iterations > 1 and self.first > 0:
+            rate = (self.norm / self.first) ** (1 / (self.iterations - 1))
+        record = {'solver': self.solver,
+                  'seconds': time.perf_counter() - self.begin,
+                  'calls': self.calls,
+                  'call seconds': self.callseconds,
+                  'iterations': self.iterations,
+                  'rate': rate,
+                  'phases': self.phases}
+        for sink in sinks:
+            sink(record)
+        return record
+
+
+def start(solver):
+    # A new Probe for a call of the named solver, or None while instrumentation is off
+    if not sinks:
+        return None
+    return Probe(solver)
+
+
+def enable(sink):
+    # Switch a sink on
+    sinks.append(sink)
+
+
+def disable(sink=None):
+    # Switch a sink off, or every sink if none is given
+    if sink is None:
+        del sinks[:]
+    elif sink in sinks:
+        sinks.remove(sink)
+
+
+@contextlib.contextmanager
+def recording(sink):
+    # Switch a sink on for the duration of a with block
+    enable(sink)
+    try:
+        yield sink
+    finally:
+        disable(sink)
+
+
+class Memory:
+    # A sink that keeps the records in a list
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def totals(self):
+        # Add up the records of each solver: calls of the solver, and the sums of everything else
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['solver'], {'count': 0, 'seconds': 0.0, 'calls': 0,
+                                                         'call seconds': 0.0, 'iterations': 0, 'phases': {}})
+            total['count'] = total['count'] + 1
+            for key in ['seconds', 'calls', 'call seconds', 'iterations']:
+                total[key] = total[key] + record[key]
+            for phase, seconds in record['phases'].items():
+                total['phases'][phase] = total['phases'].get(phase, 0.0) + seconds
+        return totals
+
+    def clear(self):
+        self.records = []
+
+
+class JSONLines:
+    # A sink that appends each record to a file, as one line of JSON. The file is kept open until close().
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __call__(self, record):
+        if self.file is None:
+            self.file = open(self.path, 'a')
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
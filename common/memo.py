@@ -0,0 +1,98 @@
+# This program is designed to remember the values of an expensive function, so a repeated call with the same
+# arguments is answered from memory instead of being evaluated again.
+#
+# Wrap the function once, and use the wrapped function in its place:
+#     g = Memo(f)
+#     simpson(g, lam, 0, np.inf, 1000)
+#     print(g.info())
+# The key is made from all of the arguments, (x, args) for an integrand and x for a system of equations.
+# numpy arrays are keyed on their shape, type and contents, so equal arrays share an entry.
+# The most recently used values are kept, and the least recently used are dropped once maxsize values are stored.
+# Stored arrays are read-only, so they can be handed out again without copying. Writing to them raises a ValueError.
+# There is one copy, in the common folder, which must be on sys.path. benchmark.py and the bench and example
+# scripts put it there; scripts of your own that import the solvers should do the same.
+
+# Required Libraries:
+from __future__ import division
+import collections
+import numpy as np
+
+
+def key(value):
+    # A hashable key for a value, or None if the value can not be keyed
+    if isinstance(value, np.ndarray):
+        return (value.shape, value.dtype.str, value.tobytes())
+    if isinstance(value, (tuple, list)):
+        parts = tuple(key(v) for v in value)
+        if any(part is None for part in parts):
+            return None
+        return (type(value).__name__,) + parts
+    if isinstance(value, np.generic):
+        return value.item()
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
+
+class Memo:
+    # Arguments are:
+    # f - the function to remember the values of.
+    # maxsize - optional. The most values kept. Default is 4096.
+
+    def __init__(self, f, maxsize=4096):
+        self.f = f
+        self.__wrapped__ = f
+        self.maxsize = maxsize
+        self.store = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, *args):
+        k = key(args)
+        if k is None:
+            # Arguments that can not be keyed are always evaluated
+            self.misses = self.misses + 1
+            return self.f(*args)
+        if k in self.store:
+            self.hits = self.hits + 1
+            self.store.move_to_end(k)
+            return self.store[k]
+
+        self.misses = self.misses + 1
+        value = self.f(*args)
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+            value.flags.writeable = False
+        self.store[k] = value
+        if len(self.store) > self.maxsize:
+            self.store.popitem(last=False)
+        return value
+
+    def hitrate(self):
+        # The share of calls answered from memory
+        calls = self.hits + self.misses
+        if calls == 0:
+            return 0.0
+        return self.hits / calls
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit rate': self.hitrate(),
+                'size': len(self.store), 'maxsize': self.maxsize}
+
+    def clear(self):
+        # Forget every value and reset the counts
+        self.store.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def wrap(f, cache):
+    # The cache argument of the solvers: False leaves f alone, True wraps it in a new Memo, and a number
+    # wraps it in a new Memo of that size. To see the hit rate, or share values between calls, wrap f yourself.
+    if cache is True:
+        return Memo(f)
+    if cache is False or cache is None:
+        return f
+    return Memo(f, cache)
@@ -0,0 +1,199 @@
+# This program is designed to implement adaptive numerical integration with an error estimate.
+# Instead of choosing the number of "bins" up front, the interval is split only where the local error estimate
+# is large. Every piece is integrated with two nested rules, and the difference between them estimates the error:
+#
+# 'simpson' - Simpson's Rule with 2 bins against Simpson's Rule with 4 bins on the same 5 points.
+#             When a piece is split, its 5 points are reused, so each half only needs 2 new points.
+# 'kronrod' - the 7 point Gauss - Legendre rule against the 15 point Gauss - Kronrod rule, which reuses
+#             the 7 Legendre points and adds 8 more.
+#
+# The piece with the largest error estimate is split in half until the total error estimate is below tolerance.
+
+# Required Libraries:
+from __future__ import division
+import heapq
+import numpy as np
+from nodes import legnodes
+from tail import substitute
+
+# The 15 Gauss - Kronrod points and weights on [-1, 1]. The points at odd positions are the 7 Legendre points.
+kronx = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                  0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                  0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                  0.207784955007898467600689403773245, 0.000000000000000000000000000000000])
+kronx = np.concatenate([-kronx[:-1], kronx[::-1]])
+kronw = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                  0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                  0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                  0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+kronw = np.concatenate([kronw[:-1], kronw[::-1]])
+
+
+def evaluator(f, args, vectorize):
+    # Inputs:
+    # f - the function being integrated
+    # args - a tuple of arguments to pass to f
+    # vectorize - if True, f is called once on a whole vector of points
+    # Outputs:
+    # g - a function that takes a vector of points and returns the vector of functional values
+    # count - a list holding the number of functional evaluations so far
+    ###################################################
+
+    count = [0]
+
+    def g(x):
+        count[0] = count[0] + len(x)
+        if vectorize:
+            try:
+                f_x = np.asarray(f(x, args), dtype=float)
+            except (TypeError, ValueError):
+                f_x = None
+            if f_x is not None and f_x.shape == x.shape:
+                return f_x
+        # Fall back to one point at a time
+        f_x = np.zeros(len(x))
+        for i in range(len(x)):
+            f_x[i] = f(x[i], args)
+        return f_x
+
+    return g, count
+
+
+def simppiece(g, a, b, f_end):
+    # Inputs:
+    # g - function from evaluator
+    # a, b - the limits of the piece
+    # f_end - the functional values at a, (a+b)/2 and b
+    # Outputs:
+    # integral - Simpson's Rule with 4 bins
+    # error - the error estimate
+    # f_all - the functional values at the 5 points, so the halves can reuse them
+    ###################################################
+
+    h = (b-a)/4
+    f_new = g(np.array([a + h, a + 3*h]))
+    f_all = np.array([f_end[0], f_new[0], f_end[1], f_new[1], f_end[2]])
+
+    coarse = (b-a)/6*(f_all[0] + 4*f_all[2] + f_all[4])
+    integral = (b-a)/12*(f_all[0] + 4*f_all[1] + 2*f_all[2] + 4*f_all[3] + f_all[4])
+    # The error of the 4 bin rule is about 1/15 of the difference between the two rules
+    error = abs(integral - coarse)/15
+
+    return integral, error, f_all
+
+
+def kronpiece(g, a, b):
+    # Inputs:
+    # g - function from evaluator
+    # a, b - the limits of the piece
+    # Outputs:
+    # integral - the 15 point Gauss - Kronrod value
+    # error - the error estimate
+    ###################################################
+
+    m = (b-a)/2
+    f_x = g(a + (kronx+1)*m)
+
+    # The 7 point Gauss - Legendre rule uses every other Kronrod point
+    x, w = legnodes(7)
+    integral = m*np.dot(kronw, f_x)
+    gauss = m*np.dot(w, f_x[1::2])
+    error = abs(integral - gauss)
+
+    return integral, error
+
+
+def Adapt(f, a, b, args, tol=1e-8, method='kronrod', maxpieces=2000, vectorize=False):
+    # Inputs:
+    # f - the function being integrated
+    # a - lower integration limit
+    # b - upper integration limit, may be np.inf
+    # args - a tuple of arguments to pass to f
+    # tol - optional. The total error estimate that must be reached. Default is 1e-8.
+    # method - optional. 'kronrod' or 'simpson'. Default is 'kronrod'.
+    # maxpieces - optional. The maximum number of pieces the interval is split into. Default is 2000.
+    # vectorize - optional. If True, f is called once per piece on a vector of points. Default is False.
+
+    # Outputs:
+    # integral - the approximated value of the integral
+    # error - the estimated absolute error
+    # evals - the number of functional evaluations used
+    ###################################################
+
+    # An infinite upper bound is mapped onto [0, 1] (see tail.py)
+    if b == np.inf:
+        f = substitute(f, a)
+        a, b = 0, 1
+
+    g, count = evaluator(f, args, vectorize)
+
+    # Integrate the whole interval as the first piece
+    if method == 'simpson':
+        f_end = g(np.array([a, (a+b)/2, b]))
+        integral, error, f_all = simppiece(g, a, b, f_end)
+    elif method == 'kronrod':
+        integral, error = kronpiece(g, a, b)
+        f_all = None
+    else:
+        raise ValueError("Unknown method: " + str(method))
+
+    # The pieces are kept in a heap, so the piece with the largest error is always on top
+    pieces = [(-error, a, b, integral, f_all)]
+    total = integral
+    totalerr = error
+
+    while totalerr > tol and len(pieces) < maxpieces:
+        # Split the piece with the largest error in half
+        negerr, left, right, piece, f_all = heapq.heappop(pieces)
+        mid = (left + right)/2
+        total = total - piece
+        totalerr = totalerr + negerr
+
+        for lo, hi, f_end in [(left, mid, None if f_all is None else f_all[0:3]),
+                              (mid, right, None if f_all is None else f_all[2:5])]:
+            if method == 'simpson':
+                integral, error, f_half = simppiece(g, lo, hi, f_end)
+            else:
+                integral, error = kronpiece(g, lo, hi)
+                f_half = None
+            heapq.heappush(pieces, (-error, lo, hi, integral, f_half))
+            total = total + integral
+            totalerr = totalerr + error
+
+    # Add the pieces up again, so rounding from the running totals does not build up
+    integral = sum(piece[3] for piece in pieces)
+    error = sum(-piece[0] for piece in pieces)
+
+    return integral, error, count[0]
+
+
+def adaptive(f, lam, lower, upper, tol=1e-8, method='kronrod'):
+    # Inputs:
+    # f - function to be integrated
+    # lam - a vector of relevant parameter values
+    # lower - lower bound of integration
+    # upper - upper bound of integration
+    # tol - optional. The error tolerance for every integral. Default is 1e-8.
+    # method - optional. 'kronrod' or 'simpson'. Default is 'kronrod'.
+
+    # Output:
+    # solution - vector of results
+    ###############################
+
+    # create an empty array to store results to
+    solution = np.zeros(len(lam))
+
+    # For each value of lambda, the loop will find the value of the integral, and store it to the above vector
+    for i in range(len(lam)):
+        # Create a tuple that contains a vector of parameters
+        parameters = np.array([0.04, lam[i], 0.5])
+        ptup = (parameters)
+
+        # Call Adapt function from above to find the value of the integral.
+        adaptsol = Adapt(f, lower, upper, ptup, tol, method)
+
+        # Store results
+        solution[i] = adaptsol[0]
+
+    # The function returns a vector of results. each element of the vector is a different integral value
+    return solution
@@ -0,0 +1,150 @@
+# This program is designed to test the asyncio drivers (asyncsweep.py and asyncnewton.py) against a mock
+# simulation server.
+# The server is started with asyncio.start_server in the same event loop as the drivers. Each request is one line
+# of numbers; the server waits a little, like a real simulation would, and answers with one line of numbers.
+# The server counts the requests it is working on at the same time, which must never be more than limit.
+# The results must match the ones of simpson, gaussleg, sciquad, sweep and NR, which call the same functions directly.
+# For each driver it prints the number of requests, the wall time and the most requests seen at once.
+
+# Required Libraries:
+from __future__ import division
+import os
+import sys
+import time
+import asyncio
+import numpy as np
+
+# The modules shared by every folder are kept in ../common,
+# and the Newton-Raphson solvers in ../nonlinear_system
+here = os.path.dirname(os.path.abspath(__file__))
+for folder in ['common', 'nonlinear_system']:
+    sys.path.insert(0, os.path.join(here, os.pardir, folder))
+from simpson import simpson
+from gaussleg import gaussleg
+from sciquad import sciquad
+from sweep import sweep
+from asyncsweep import asimpson, agaussleg, asciquad
+from newtonraphson import NR
+from asyncnewton import aNR
+
+
+# The integrand computed by the server
+def f(x, args):
+    return args[0]*np.exp(-args[1]*x)*x**args[2]
+
+
+# The system of equations computed by the server. Its root has x_i**3 + sum(x) = i for each i.
+def F(X):
+    X = np.asarray(X, dtype=float)
+    return X**3 + X.sum() - np.arange(1, len(X) + 1)
+
+
+class Server:
+    # A mock simulation server. Each request is a line "name v1 v2 ...": name is f for the integrand, which is
+    # called as f(v1, [v2, ...]), and F for the system, which is called as F([v1, v2, ...]).
+    # Arguments are:
+    # delay - optional. The seconds spent on each request. Default is 0.001.
+
+    def __init__(self, delay=0.001):
+        self.delay = delay
+        self.busy = 0
+        self.most = 0
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        line = await reader.readline()
+        name, numbers = line.split()[0], [float(v) for v in line.split()[1:]]
+
+        self.busy = self.busy + 1
+        self.most = max(self.most, self.busy)
+        self.requests = self.requests + 1
+        await asyncio.sleep(self.delay)
+        if name == b'f':
+            value = [f(numbers[0], np.array(numbers[1:]))]
+        else:
+            value = F(numbers)
+        self.busy = self.busy - 1
+
+        # repr gives back every digit, so the client gets exactly the value computed here
+        writer.write((' '.join(repr(float(v)) for v in value) + '\n').encode())
+        await writer.drain()
+        writer.close()
+
+    def restart(self):
+        # Reset the counts before timing the next driver
+        self.most = 0
+        self.requests = 0
+
+
+class Client:
+    # Sends each call to the server on its own connection, so calls waiting at the same time really are sent together.
+    # Arguments are:
+    # port - the port the server listens on.
+
+    def __init__(self, port):
+        self.port = port
+
+    async def request(self, name, numbers):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write((name + ' ' + ' '.join(repr(float(v)) for v in numbers) + '\n').encode())
+        await writer.drain()
+        line = await reader.readline()
+        writer.close()
+        await writer.wait_closed()
+        return [float(v) for v in line.split()]
+
+    async def f(self, x, args):
+        return (await self.request('f', [x] + list(args)))[0]
+
+    async def F(self, X):
+        return np.array(await self.request('F', X))
+
+
+async def main(limit=8):
+    server = Server()
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+    client = Client(listener.sockets[0].getsockname()[1])
+
+    lam = np.linspace(0.5, 5, 8)
+    init = np.ones(6)
+
+    # Each check is: name, the async driver, and the same work done directly
+    checks = [
+        ('asimpson', lambda: asimpson(client.f, lam, 0, 10, 100, limit=limit),
+         lambda: simpson(f, lam, 0, 10, 100)),
+        ('asimpson, params', lambda: asimpson(client.f, lam, 0, 10, 100, params=(0.5, 1.0), lam_index=2, limit=limit),
+         lambda: sweep(f, lam, 0, 10, 100, 'simpson', params=(0.5, 1.0), lam_index=2)),
+        ('agaussleg', lambda: agaussleg(client.f, lam, 0, np.inf, 20, limit=limit),
+         lambda: gaussleg(f, lam, 0, np.inf, 20)),
+        ('asciquad', lambda: asciquad(client.f, lam, 0, np.inf, limit=limit),
+         lambda: sciquad(f, lam, 0, np.inf)),
+        ('aNR', lambda: aNR(client.F, init, history=False, limit=limit),
+         lambda: NR(F, init, history=False)),
+    ]
+
+    print("\nlimit = %d" % limit)
+    print("%-18s %9s %9s %13s" % ("Driver", "Requests", "Seconds", "Most at once"))
+    for name, run, direct in checks:
+        server.restart()
+        start = time.time()
+        solution = await run()
+        elapsed = time.time() - start
+        expected = direct()
+        if name == 'aNR':
+            # aNR uses forward differences, NR its own Jacobian, so the roots only agree to the tolerance
+            assert np.allclose(solution[0], expected[0], atol=1e-6)
+        else:
+            assert np.allclose(solution, expected, rtol=1e-10, atol=0)
+
+        # The drivers must never have more than limit calls waiting on the server
+        assert server.most <= limit
+
+        print("%-18s %9d %9.3f %13d" % (name, server.requests, elapsed, server.most))
+
+    listener.close()
+    await listener.wait_closed()
+
+
+if __name__ == '__main__':
+    for limit in (1, 8):
+        asyncio.run(main(limit))
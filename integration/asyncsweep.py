@@ -0,0 +1,172 @@
+# This program is designed to run the sweep drivers with integrands that wait on something else, such as a
+# simulation server, instead of computing. The integrand can be a coroutine function:
+#     async def f(x, args):
+#         return await client.evaluate(x, args)
+# (plain functions work too). Every point that does not depend on another one is requested at once:
+# all of the sample points of one integral, and the integrals for many values of lambda.
+# limit caps the number of calls to f that are waiting at the same time, so the server is not flooded.
+#
+# The drivers are coroutines, and are run with asyncio:
+#     solution = asyncio.run(asimpson(f, lam, 0, np.inf, 1000, limit=32))
+# They give the same results as simpson, trapezoid, gaussleg and sciquad.
+# To test an integrand against a mock server, start one with asyncio.start_server in the same event loop
+# (asyncbench.py does this).
+
+# Required Libraries:
+from __future__ import division
+import inspect
+import asyncio
+import concurrent.futures
+import numpy as np
+import scipy.integrate
+from sweep import rule
+from tail import subrule
+
+
+def lamvector(l, params, lam_index):
+    # The parameter vector for one value of lambda: the fixed parameters with l inserted at lam_index
+    parameters = list(params)
+    parameters.insert(lam_index, l)
+    return np.array(parameters, dtype=float)
+
+
+async def call(f, x, args, gate):
+    # Call f(x, args), waiting for a free slot first. f may be a coroutine function or a plain function.
+    async with gate:
+        value = f(x, args)
+        if inspect.isawaitable(value):
+            value = await value
+    return float(value)
+
+
+async def values(f, x, args, gate):
+    # Call f at every point of the vector x at the same time
+    return np.array(await asyncio.gather(*[call(f, xi, args, gate) for xi in x]))
+
+
+async def adoubling(integrate, a, b=50, rtol=1e-6, atol=0, maxiter=64):
+    # The same search as doubling in tail.py, for a coroutine integrate(a, b).
+    # Each piece needs the one before it, so only the points within a piece are requested together.
+    if b <= a:
+        b = a + b
+
+    total = await integrate(a, b)
+
+    for iteration in range(maxiter):
+        piece = await integrate(b, 2*b)
+        total = total + piece
+        b = 2*b
+
+        if not abs(piece) > rtol*abs(total) + atol:
+            break
+
+    return total
+
+
+async def aintegral(f, a, b, t, w, args, gate, tail='double', rtol=1e-6):
+    # Inputs:
+    # f - the function being integrated
+    # a - lower integration limit
+    # b - upper integration limit, may be np.inf
+    # t, w - sample points on [0, 1] and their weights (see rule in sweep.py)
+    # args - a tuple of arguments to pass to f
+    # gate - an asyncio.Semaphore, shared by every call to f
+    # tail - optional. How an infinite upper bound is handled, 'double' or 'substitute' (see tail.py). Default is 'double'.
+    # rtol - optional. Relative tolerance for the 'double' tail search. Default is 1e-6.
+    # Outputs:
+    # integral - the approximated value of the integral
+    ###################################################
+
+    async def piece(lo, hi):
+        return (hi-lo)*np.dot(w, await values(f, lo + (hi-lo)*t, args, gate))
+
+    if b == np.inf:
+        if tail == 'substitute':
+            x, v = subrule(t, w, a)
+            return np.dot(v, await values(f, x, args, gate))
+        return await adoubling(piece, a, rtol=rtol)
+    return await piece(a, b)
+
+
+async def asweep(f, lam, lower, upper, n, method='simpson', params=(0.04, 0.5), lam_index=1, limit=16, tail='double',
+                 rtol=1e-6):
+    # Inputs:
+    # f - function to be integrated, called as f(x, parameters). May be a coroutine function.
+    # lam - a vector of relevant parameter values
+    # lower - lower bound of integration
+    # upper - upper bound of integration
+    # n - the number of "bins" to integrate over (or sample points, for 'gaussleg')
+    # method - optional. 'simpson', 'trapezoid' or 'gaussleg'. Default is 'simpson'.
+    # params - optional. A tuple of the fixed parameters. Default is (0.04, 0.5).
+    # lam_index - optional. The position of lambda in the parameter vector. Default is 1.
+    # limit - optional. The most calls to f waiting at the same time. Default is 16.
+    # tail - optional. How an infinite upper bound is handled, 'double' or 'substitute' (see tail.py). Default is 'double'.
+    # rtol - optional. Relative tolerance for the 'double' tail search. Default is 1e-6.
+
+    # Output:
+    # solution - vector of results
+    ###############################
+
+    t, w = rule(method, n)
+    gate = asyncio.Semaphore(limit)
+
+    # At most limit integrals are started at once, so a long lam does not create every request up front
+    started = asyncio.Semaphore(limit)
+
+    async def one(l):
+        async with started:
+            parameters = lamvector(l, params, lam_index)
+            return await aintegral(f, lower, upper, t, w, parameters, gate, tail, rtol)
+
+    solution = await asyncio.gather(*[one(l) for l in lam])
+
+    # The function returns a vector of results. each element of the vector is a different integral value
+    return np.array(solution, dtype=float)
+
+
+async def asimpson(f, lam, lower, upper, n, params=(0.04, 0.5), lam_index=1, limit=16, tail='double', rtol=1e-6):
+    # simpson, for an integrand that may be a coroutine function. See asweep for the arguments.
+    return await asweep(f, lam, lower, upper, n, 'simpson', params, lam_index, limit, tail, rtol)
+
+
+async def atrapezoid(f, lam, lower, upper, n, params=(0.04, 0.5), lam_index=1, limit=16, tail='double', rtol=1e-6):
+    # trapezoid, for an integrand that may be a coroutine function. See asweep for the arguments.
+    return await asweep(f, lam, lower, upper, n, 'trapezoid', params, lam_index, limit, tail, rtol)
+
+
+async def agaussleg(f, lam, lower, upper, n, params=(0.04, 0.5), lam_index=1, limit=16, tail='double', rtol=1e-6):
+    # gaussleg, for an integrand that may be a coroutine function. See asweep for the arguments.
+    return await asweep(f, lam, lower, upper, n, 'gaussleg', params, lam_index, limit, tail, rtol)
+
+
+async def asciquad(f, lam, lower, upper, params=(0.04, 0.5), lam_index=1, limit=16):
+    # Inputs:
+    # f - function to be integrated, called as f(x, parameters). May be a coroutine function.
+    # lam - a vector of relevant parameter values
+    # lower - lower bound of integration
+    # upper - upper bound of integration
+    # params - optional. A tuple of the fixed parameters. Default is (0.04, 0.5).
+    # lam_index - optional. The position of lambda in the parameter vector. Default is 1.
+    # limit - optional. The most calls to f waiting at the same time. Default is 16.
+
+    # Output:
+    # solution - vector of results
+    ###############################
+
+    # scipy's quad picks each point from the ones before it, so it can only wait on one call at a time.
+    # Each value of lambda gets its own quad, run in a thread, and its calls to f are sent back to this event loop.
+    loop = asyncio.get_running_loop()
+    gate = asyncio.Semaphore(limit)
+
+    def g(x, parameters):
+        return asyncio.run_coroutine_threadsafe(call(f, x, parameters, gate), loop).result()
+
+    def one(l):
+        parameters = lamvector(l, params, lam_index)
+        return scipy.integrate.quad(g, lower, upper, args=(parameters,))[0]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=limit) as pool:
+        solution = await asyncio.gather(*[loop.run_in_executor(pool, one, l) for l in lam])
+
+    # The function returns a vector of results. each element of the vector is a different integral value
+    return np.array(solution, dtype=float)
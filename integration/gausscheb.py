@@ -2,9 +2,11 @@
 # Required Libraries:
 from __future__ import division
 import numpy as np
+import instrument
+from nodes import chebnodes
 
 
-def Gc(f, a, b, x, w, args):
+def Gc(f, a, b, n, args):
     # Inputs:
     # f - the function being integrated
     # a - lower integration limit
@@ -15,8 +17,13 @@ def Gc(f, a, b, x, w, args):
     # integral - the approximated value of the integral
     ###################################################
 
-    # Generate sample points and weights
-    x, w = np.polynomial.chebyshev.chebgauss(n)
+    # Generate sample points and weights (computed once per n, then taken from the cache)
+    x, w = chebnodes(n)
+
+    # Count and time the calls to f, if instrumentation is on (see instrument.py)
+    probe = instrument.start('Gc')
+    if probe is not None:
+        f = probe.wrap(f)
 
     m = (b-a)/2
 
@@ -26,15 +33,20 @@ def Gc(f, a, b, x, w, args):
         return f(y, args)*((1-x**2)**0.5)
 
     # Create an empty vector to store results to
-    f_vec = numpy.empty(len(x))
+    f_vec = np.empty(len(x))
 
     # For each sample point x, find the functional value and multiply it by its respective weighting.
     for i in range(len(x)):
         f_xi = g(a,b,x[i])
         f_vec[(i - 1)] = w[i] * f_xi
 
+    if probe is not None:
+        probe.lap('evaluate')
+
     # The integral is the weighted sum of the functional values, multiplied by (b-a)/2
     integral = np.sum(f_vec)*m
+    if probe is not None:
+        probe.finish('sum')
 
     return integral
 
@@ -2,6 +2,10 @@
 # Required Libraries:
 from __future__ import division
 import numpy as np
+import instrument
+from nodes import legnodes
+from tail import doubling, substitute
+from memo import wrap
 
 
 def Gl(f, a, b, x, w, args):
@@ -16,6 +20,11 @@ def Gl(f, a, b, x, w, args):
     # integral - the approximated value of the integral
     ###################################################
 
+    # Count and time the calls to f, if instrumentation is on (see instrument.py)
+    probe = instrument.start('Gl')
+    if probe is not None:
+        f = probe.wrap(f)
+
     m = (b-a)/2
 
     # g transforms the original function f
@@ -31,26 +40,44 @@ def Gl(f, a, b, x, w, args):
         f_xi = g(a,b,x[i])
         f_vec[(i - 1)] = w[i] * f_xi
 
+    if probe is not None:
+        probe.lap('evaluate')
+
     # The integral is the weighted sum of the functional values, multiplied by (b-a)/2
     integral = np.sum(f_vec)*m
+    if probe is not None:
+        probe.finish('sum')
 
     return integral
 
 
-def gaussleg(f, lam, lower, upper, n):
+def gaussleg(f, lam, lower, upper, n, tail='double', rtol=1e-6, cache=False, store=None):
     # Inputs:
     # f - function to be integrated
     # lam - a vector of relevant parameter values
     # lower - lower bound of integration
     # upper - upper bound of integration
     # n - the number of "bins" to integrate over
+    # tail - optional. How an infinite upper bound is handled, 'double' or 'substitute' (see tail.py). Default is 'double'.
+    # rtol - optional. Relative tolerance for the 'double' tail search. Default is 1e-6.
+    # cache - optional. If True, values of f are remembered, so repeated points are not evaluated again (see memo.py).
+    #         A number sets how many are kept. Default is False.
+    # store - optional. A Store (see store.py). Results already on disk are looked up, and only the missing values
+    #         of lambda are computed. Default is None.
 
     # Output:
     # solution - vector of results
     ###############################
 
-    # Generate sample points and weights
-    x, w = np.polynomial.legendre.leggauss(n)
+    # Generate sample points and weights (computed once per n, then taken from the cache)
+    x, w = legnodes(n)
+
+    # Look the results up on disk, and only compute the missing ones
+    if store is not None:
+        return store.sweep(gaussleg, f, lam, (lower, upper, n, tail, rtol, cache))
+
+    # Remember the values of f, if asked to
+    f = wrap(f, cache)
 
     # create an empty array to store results to
     solution = np.zeros(len(lam))
@@ -63,21 +90,14 @@ def gaussleg(f, lam, lower, upper, n):
 
         # This takes care of infinite upper bound
         if (upper == np.inf):
-            bdiff = 1
-            b_0 = 50
-            # While the difference between choices of b is still significant, we will continue to increase b
-            # When doubling b no longer significantly changes the integral, then the loop breaks.
-            while abs(bdiff) > .01:
-                b_1 = b_0 * 2
-                result_0 = Gl(f, lower, b_0, x, w, ptup)
-                result_1 = Gl(f, lower, b_1, x, w, ptup)
-                bdiff = result_1 - result_0
-                b_0 = b_1
+            # Either map [lower, inf) onto [0, 1] and integrate once, or keep adding pieces [b, 2b] until they stop mattering
+            if tail == 'substitute':
+                gausslegsol = Gl(substitute(f, lower), 0, 1, x, w, ptup)
+            else:
+                gausslegsol = doubling(lambda a, b: Gl(f, a, b, x, w, ptup), lower, rtol=rtol)
         else:
-            b_1 = up
-
-        # Call gl function from above to find the value of the integral.
-        gausslegsol = Gl(f, lower, b_1, x, w, ptup)
+            # Call gl function from above to find the value of the integral.
+            gausslegsol = Gl(f, lower, upper, x, w, ptup)
 
         # Store results
         solution[i] = gausslegsol
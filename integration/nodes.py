@@ -0,0 +1,116 @@
+# This program is designed to cache the sample points and weights used by Gauss - Legendre and Gauss - Chebyshev quadrature.
+# Finding the points for a high order rule is an eigenvalue problem that costs far more than the quadrature
+# itself, so each set of points and weights is computed once per order and then handed out from the cache.
+#
+# The cached arrays are read-only, so they can be shared without copying. Writing to them raises a ValueError.
+# The cache keeps the most recently used orders and drops the least recently used ones when it is full.
+# If a cache directory is set with setcachedir, points and weights are also saved there as .npy files,
+# so that later runs load them from disk instead of recomputing them.
+
+# Required Libraries:
+from __future__ import division
+import os
+import collections
+import numpy as np
+
+# The rules that can be cached, and the numpy function that computes each of them
+rules = {'legendre': np.polynomial.legendre.leggauss,
+         'chebyshev': np.polynomial.chebyshev.chebgauss}
+
+# The in memory cache, ordered from least to most recently used
+cache = collections.OrderedDict()
+maxsize = 64
+
+# The directory used to save points and weights to disk. None means nothing is saved.
+cachedir = None
+
+
+def setcachedir(path):
+    # Inputs:
+    # path - a directory to save points and weights to, or None to stop saving them
+    ###################################################
+    global cachedir
+
+    if path is not None and not os.path.isdir(path):
+        os.makedirs(path)
+    cachedir = path
+
+
+def setmaxsize(size):
+    # Inputs:
+    # size - the number of orders kept in memory. The least recently used are dropped first.
+    ###################################################
+    global maxsize
+
+    maxsize = size
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def clear():
+    # Empties the in memory cache. Files already saved to disk are kept.
+    ###################################################
+    cache.clear()
+
+
+def gaussnodes(kind, n):
+    # Inputs:
+    # kind - 'legendre' or 'chebyshev'
+    # n - the number of sample points
+    # Outputs:
+    # x - a read-only vector of sample points on [-1, 1]
+    # w - a read-only vector of weights
+    ###################################################
+
+    key = (kind, n)
+
+    # Most recent orders are kept at the end of the cache
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    if kind not in rules:
+        raise ValueError("Unknown rule: " + str(kind))
+
+    # Look for the points and weights on disk before computing them
+    path = None
+    if cachedir is not None:
+        path = os.path.join(cachedir, kind + "_" + str(n) + ".npy")
+    if path is not None and os.path.exists(path):
+        xw = np.load(path)
+        x, w = xw[0], xw[1]
+    else:
+        x, w = rules[kind](n)
+        if path is not None:
+            # Write to a temporary file first, so other processes never load a half written file
+            tmp = path + "." + str(os.getpid()) + ".tmp"
+            with open(tmp, 'wb') as fh:
+                np.save(fh, np.vstack([x, w]))
+            os.replace(tmp, path)
+
+    x.setflags(write=False)
+    w.setflags(write=False)
+
+    cache[key] = (x, w)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
+    return x, w
+
+
+def legnodes(n):
+    # Inputs:
+    # n - the number of sample points
+    # Outputs:
+    # x, w - read-only Gauss - Legendre sample points and weights
+    ###################################################
+    return gaussnodes('legendre', n)
+
+
+def chebnodes(n):
+    # Inputs:
+    # n - the number of sample points
+    # Outputs:
+    # x, w - read-only Gauss - Chebyshev sample points and weights
+    ###################################################
+    return gaussnodes('chebyshev', n)
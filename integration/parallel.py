@@ -0,0 +1,80 @@
+# This program is designed to run the sweep drivers (simpson, trapezoid, gaussleg, sciquad or sweep) in parallel.
+# The vector of lambda values is split into chunks, each chunk is sent to a worker process, and the results
+# are put back together in the same order as lam.
+#
+# The worker processes are kept alive between calls, so only the first call pays the cost of starting them.
+# Because the work is sent to other processes, the driver and the integrand f must be defined at the top
+# level of a module (not a lambda or a nested function) so that they can be pickled.
+# Scripts that use parsweep should call it from inside an  if __name__ == '__main__':  block.
+
+# Required Libraries:
+from __future__ import division
+import concurrent.futures
+import numpy as np
+from cores import cores
+
+# The pool of worker processes shared between calls, and its number of workers
+pool = None
+poolsize = 0
+
+
+def getpool(workers=None):
+    # Inputs:
+    # workers - optional. The number of worker processes. Default is every available core.
+    # Output:
+    # pool - a process pool with the requested number of workers. An existing pool is reused when it matches.
+    ###################################################
+    global pool, poolsize
+
+    if workers is None:
+        workers = cores()
+
+    if pool is None or poolsize != workers:
+        shutdown()
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        poolsize = workers
+
+    return pool
+
+
+def shutdown():
+    # Stops the worker processes. The next call to parsweep will start new ones.
+    ###################################################
+    global pool, poolsize
+
+    if pool is not None:
+        pool.shutdown()
+    pool = None
+    poolsize = 0
+
+
+def parsweep(driver, f, lam, args=(), workers=None, chunks=None):
+    # Inputs:
+    # driver - a sweep driver called as driver(f, lam, *args), e.g. simpson, gaussleg, sciquad or sweep
+    # f - function to be integrated
+    # lam - a vector of relevant parameter values
+    # args - optional. A tuple of the remaining arguments to the driver, e.g. (lower, upper, n)
+    # workers - optional. The number of worker processes. Default is every available core.
+    # chunks - optional. The number of pieces lam is split into. Default is 4 per worker, so that
+    #          workers that finish early can pick up more work.
+
+    # Output:
+    # solution - vector of results, in the same order as lam
+    ###############################
+
+    lam = np.asarray(lam, dtype=float).ravel()
+
+    executor = getpool(workers)
+
+    if chunks is None:
+        chunks = 4*poolsize
+    chunks = max(min(int(chunks), len(lam)), 1)
+
+    # Send each chunk of lambda values to a worker. Futures are kept in input order.
+    futures = [executor.submit(driver, f, piece, *args) for piece in np.array_split(lam, chunks)]
+
+    # Put the results back together in the same order as lam
+    solution = np.concatenate([np.asarray(future.result(), dtype=float) for future in futures])
+
+    # The function returns a vector of results. each element of the vector is a different integral value
+    return solution
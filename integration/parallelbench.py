@@ -0,0 +1,52 @@
+# This program is designed to show how parsweep scales with the number of worker processes.
+# It times a sciquad sweep over lambda with 1, 2, 4, ... workers (up to every available core)
+# and prints the wall time, speedup and parallel efficiency for each.
+
+# Required Libraries:
+from __future__ import division
+import os
+import sys
+import time
+import numpy as np
+
+# The modules shared by every folder are kept in ../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+from sciquad import sciquad
+from parallel import parsweep, shutdown
+from cores import cores
+
+
+# An integrand that cannot be vectorized: it runs a python loop for every point
+def f(x, args):
+    total = 0.0
+    for k in range(1, 20):
+        total = total + np.exp(-args[1]*x*k)/k**2
+    return args[0]*total*(1+x)**(-args[2])
+
+
+if __name__ == '__main__':
+    lam = np.linspace(0.1, 5, 2000)
+
+    # Serial run, for the baseline
+    start = time.time()
+    serial = sciquad(f, lam, 0, np.inf)
+    base = time.time() - start
+    print("\nWorkers   Seconds   Speedup   Efficiency")
+    print("%7d %9.3f %9.2f %12.2f" % (1, base, 1, 1))
+
+    workers = 2
+    while workers <= cores():
+        # Warm up the pool, so that starting the processes is not counted
+        parsweep(sciquad, f, lam[:workers], (0, np.inf), workers)
+
+        start = time.time()
+        solution = parsweep(sciquad, f, lam, (0, np.inf), workers)
+        elapsed = time.time() - start
+
+        # The parallel results must match the serial ones, in the same order
+        assert np.allclose(solution, serial)
+
+        print("%7d %9.3f %9.2f %12.2f" % (workers, elapsed, base/elapsed, base/elapsed/workers))
+        workers = workers*2
+
+    shutdown()
@@ -0,0 +1,94 @@
+# This program is designed to implement Romberg integration on top of the Trapezoid Rule.
+# The Trapezoid Rule is applied with 1, 2, 4, 8, ... bins. Doubling the bins keeps every old point, so each
+# level only evaluates the function at the new midpoints, and reuses the sum from the level before.
+# Richardson extrapolation then combines the levels into rules of higher and higher order.
+# The process stops once successive extrapolated values agree within tolerance.
+
+# Required Libraries:
+from __future__ import division
+import numpy as np
+from trapezoid import Tz
+from adaptive import evaluator
+from tail import substitute
+
+
+def Romb(f, a, b, args, tol=1e-10, maxlevel=25, vectorize=False):
+    # Inputs:
+    # f - the function being integrated
+    # a - lower integration limit
+    # b - upper integration limit, may be np.inf
+    # args - a tuple of arguments to pass to f
+    # tol - optional. Successive extrapolated values must agree within tol. Default is 1e-10.
+    # maxlevel - optional. The maximum number of times the bins are doubled. Default is 25.
+    # vectorize - optional. If True, f is called once per level on all the new midpoints. Default is False.
+
+    # Outputs:
+    # integral - the approximated value of the integral
+    # error - the difference between the last two extrapolated values
+    # evals - the number of functional evaluations used
+    ###################################################
+
+    # An infinite upper bound is mapped onto [0, 1] (see tail.py)
+    if b == np.inf:
+        f = substitute(f, a)
+        a, b = 0, 1
+
+    g, count = evaluator(f, args, vectorize)
+
+    # Level 0 is the Trapezoid Rule with a single bin, which uses the 2 end points
+    R = [[Tz(f, a, b, 1, args)]]
+    count[0] = count[0] + 2
+    error = np.inf
+
+    for k in range(1, maxlevel + 1):
+        # Width of a bin on this level. The new points are the midpoints of the bins from the level before.
+        h = (b-a)/2**k
+        x = a + (2*np.arange(2**(k-1)) + 1)*h
+        trap = R[k-1][0]/2 + h*np.sum(g(x))
+
+        # Richardson extrapolation: every column removes the next term of the error
+        row = [trap]
+        for j in range(1, k + 1):
+            row.append(row[j-1] + (row[j-1] - R[k-1][j-1])/(4**j - 1))
+        R.append(row)
+
+        # Stop once the last two extrapolated values agree. At least 4 levels are used,
+        # so that a few points that happen to agree do not end the process too early.
+        error = abs(R[k][k] - R[k-1][k-1])
+        if k >= 4 and error < tol:
+            break
+
+    integral = R[-1][-1]
+
+    return integral, error, count[0]
+
+
+def romberg(f, lam, lower, upper, tol=1e-10):
+    # Inputs:
+    # f - function to be integrated
+    # lam - a vector of relevant parameter values
+    # lower - lower bound of integration
+    # upper - upper bound of integration
+    # tol - optional. The error tolerance for every integral. Default is 1e-10.
+
+    # Output:
+    # solution - vector of results
+    ###############################
+
+    # create an empty array to store results to
+    solution = np.zeros(len(lam))
+
+    # For each value of lambda, the loop will find the value of the integral, and store it to the above vector
+    for i in range(len(lam)):
+        # Create a tuple that contains a vector of parameters
+        parameters = np.array([0.04, lam[i], 0.5])
+        ptup = (parameters)
+
+        # Call Romb function from above to find the value of the integral.
+        rombsol = Romb(f, lower, upper, ptup, tol)
+
+        # Store results
+        solution[i] = rombsol[0]
+
+    # The function returns a vector of results. each element of the vector is a different integral value
+    return solution
@@ -5,17 +5,23 @@ import scipy.integrate
 import numpy as np
 
 
-def sciquad(f,lam,lower,upper):
+def sciquad(f,lam,lower,upper,store=None):
 	# Inputs:
 	# f - function to be integrated
 	# lam - a vector of relevant parameter values
 	# lower - lower bound of integration
 	# upper - upper bound of integration
+	# store - optional. A Store (see store.py). Results already on disk are looked up, and only the missing values
+	#         of lambda are computed. Default is None.
 
 	# Output:
 	# solution - vector of results
 	###############################
 
+	# Look the results up on disk, and only compute the missing ones
+	if store is not None:
+		return store.sweep(sciquad, f, lam, (lower, upper))
+
 	# create an empty array to store results to
 	solution = np.zeros(len(lam))
 
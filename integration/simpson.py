@@ -2,23 +2,53 @@
 
 from __future__ import division
 import numpy as np
+import instrument
+from tail import doubling, substitute
+from memo import wrap
 
 
-def Simp(f, a, b, n, args):
+def Simp(f, a, b, n, args, vectorize=False):
 	# Inputs:
 	# f - the function being integrated
 	# a - lower integration limit
 	# b - upper integration limit
 	# n - the number of "bins" to integrate over
 	# args - a tuple of arguments to pass to f
+	# vectorize - optional. If True, f is called once on the whole grid of points. Default is False.
 
 	# Outputs:
 	# integral - the approximated value of the integral
 	###################################################
 
+	# Count and time the calls to f, if instrumentation is on (see instrument.py)
+	probe = instrument.start('Simp')
+	if probe is not None:
+		f = probe.wrap(f)
+
 	# Calculate the necessary change in x (width of "bin")
 	dx = (b - a)/n
 
+	# Vectorized mode: evaluate f on every grid point at once and take the weighted sum with a dot product.
+	# If f cannot take an array, we fall through to the point by point loop below.
+	if vectorize:
+		x = a + np.arange(n+1)*dx
+		try:
+			f_x = np.asarray(f(x,args), dtype=float)
+		except (TypeError, ValueError):
+			f_x = None
+		if probe is not None:
+			probe.lap('evaluate')
+		if f_x is not None and f_x.shape == x.shape:
+			# End points receive a weight of 1, odd instances a weight of 4 and even instances a weight of 2
+			weights = np.full(n+1, 2.0)
+			weights[1:n:2] = 4
+			weights[0] = 1
+			weights[n] = 1
+			integral = (dx/3)*np.dot(weights, f_x)
+			if probe is not None:
+				probe.finish('sum')
+			return integral
+
 	# Calculate initial functional value (at lower limit)
 	f0 = f(a,args)
 
@@ -39,27 +69,46 @@ def Simp(f, a, b, n, args):
 			x = a + (i*dx)
 			f_i[i-1] = 4*f(x,args)
 
+	if probe is not None:
+		probe.lap('evaluate')
+
 	# Sum all weighted intermediate functional values
 	fi = np.sum(f_i)
 
 	# The integral is equal to the sum of all weighted functional values, times the change in x divided by 3
 	integral = (dx/3)*(fi+f0+fn)
+	if probe is not None:
+		probe.finish('sum')
 
 	return integral
 
 
-def simpson(f, lam, lower, upper, n):
+def simpson(f, lam, lower, upper, n, vectorize=False, tail='double', rtol=1e-6, cache=False, store=None):
 	# Inputs:
 	# f - function to be integrated
 	# lam - a vector of relevant parameter values
 	# lower - lower bound of integration
 	# upper - upper bound of integration
 	# n - the number of "bins" to integrate over
+	# vectorize - optional. Passed on to Simp. Default is False.
+	# tail - optional. How an infinite upper bound is handled, 'double' or 'substitute' (see tail.py). Default is 'double'.
+	# rtol - optional. Relative tolerance for the 'double' tail search. Default is 1e-6.
+	# cache - optional. If True, values of f are remembered, so repeated points are not evaluated again (see memo.py).
+	#         A number sets how many are kept. Default is False.
+	# store - optional. A Store (see store.py). Results already on disk are looked up, and only the missing values
+	#         of lambda are computed. Default is None.
 
 	# Output:
 	# solution - vector of results
 	###############################
 
+	# Look the results up on disk, and only compute the missing ones
+	if store is not None:
+		return store.sweep(simpson, f, lam, (lower, upper, n, vectorize, tail, rtol, cache))
+
+	# Remember the values of f, if asked to
+	f = wrap(f, cache)
+
 	# create an empty array to store results to
 	solution = np.zeros(len(lam))
 
@@ -71,21 +120,14 @@ def simpson(f, lam, lower, upper, n):
 
 		# This takes care of infinite upper bound
 		if (upper == np.inf):
-			bdiff = 1
-			b_0 = 50
-			# While the difference between choices of b is still significant, we will continue to increase b
-			# When doubling b no longer significantly changes the integral, then the loop breaks.
-			while abs(bdiff) > .01:
-				b_1 = b_0*2
-				result_0 = Simp(f, lower, b_0, n, ptup)
-				result_1 = Simp(f, lower, b_1, n, ptup)
-				bdiff = result_1 - result_0
-				b_0 = b_1
+			# Either map [lower, inf) onto [0, 1] and integrate once, or keep adding pieces [b, 2b] until they stop mattering
+			if tail == 'substitute':
+				simpsol = Simp(substitute(f, lower), 0, 1, n, ptup, vectorize)
+			else:
+				simpsol = doubling(lambda a, b: Simp(f, a, b, n, ptup, vectorize), lower, rtol=rtol)
 		else:
-			b_1 = up
-
-		# Call simp function from above to find the value of the integral.
-		simpsol = Simp(f, lower, b_1, n, ptup)
+			# Call simp function from above to find the value of the integral.
+			simpsol = Simp(f, lower, upper, n, ptup, vectorize)
 
 		# Store results
 		solution[i] = simpsol
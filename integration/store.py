@@ -0,0 +1,192 @@
+# This program is designed to keep the results of the sweep drivers on disk, so a sweep that is run again
+# only computes the values of lambda that have not been computed before.
+#
+# The results are kept in a local SQLite file. Each result is filed under a key made from:
+#   the integrand (its module, name and compiled code, so editing the integrand gives it a new key,
+#   and the values bound into it: defaults, closure variables, and the arguments of a functools.partial),
+#   the driver (likewise, so the fixed parameters inside a driver are covered),
+#   the remaining arguments of the driver (lower, upper, n, tail, ...),
+#   and the value of lambda itself.
+# Usage:
+#     results = Store('sweeps.sqlite')
+#     solution = simpson(f, lam, 0, np.inf, 1000, store=results)
+# or, for any driver:
+#     solution = results.sweep(simpson, f, lam, (0, np.inf, 1000))
+#
+# maxrows limits the size of the file: once it is reached, the results that were used least recently are dropped.
+# invalidate(f) drops every result of an integrand, and clear() drops everything.
+# Integrands that read global variables, or call other functions that change, are not covered by the key.
+# Pass version= (any string) to start a fresh set of results for them. Integrands that can not be keyed reliably
+# (callable objects without compiled code, or closures over objects with no stable printed form) raise a
+# ValueError unless a version is given.
+
+# Required Libraries:
+from __future__ import division
+import time
+import types
+import functools
+import sqlite3
+import hashlib
+import numpy as np
+
+
+def codekey(code):
+    # The parts of a compiled function that decide what it computes. Nested functions are followed,
+    # since their repr holds a memory address that changes from run to run.
+    consts = [codekey(c) if isinstance(c, types.CodeType) else repr(c) for c in code.co_consts]
+    return repr((code.co_code.hex(), consts, code.co_names, code.co_varnames))
+
+
+def valuekey(value):
+    # A string for a value bound into an integrand (a closure cell, a default or a partial argument).
+    # Raises a ValueError for values whose printed form does not pin down their contents.
+    value = plain(value)
+    if isinstance(value, np.ndarray):
+        return repr(('array', value.shape, value.dtype.str, hashlib.sha256(value.tobytes()).hexdigest()))
+    if isinstance(value, (tuple, list)):
+        return repr(tuple(valuekey(v) for v in value))
+    if isinstance(value, dict):
+        return repr(tuple(sorted((repr(k), valuekey(v)) for k, v in value.items())))
+    if isinstance(value, (types.BuiltinFunctionType, np.ufunc)):
+        return repr(('builtin', getattr(value, '__module__', ''), value.__name__))
+    if callable(value):
+        return repr(fingerprint(value))
+    text = repr(value)
+    if ' at 0x' in text:
+        raise ValueError("Can not make a key from " + text)
+    return text
+
+
+def fingerprint(f):
+    # The parts of a function that decide what it computes: its name, compiled code, defaults, and the values
+    # bound into it by a closure or by functools.partial. Raises a ValueError if f can not be keyed reliably.
+    while hasattr(f, '__wrapped__'):
+        f = f.__wrapped__
+    if isinstance(f, functools.partial):
+        return ['partial', fingerprint(f.func), valuekey(f.args), valuekey(f.keywords)]
+    code = getattr(f, '__code__', None)
+    if code is None:
+        raise ValueError("Can not make a key from " + repr(f))
+    parts = [getattr(f, '__module__', ''), f.__qualname__, codekey(code),
+             valuekey(f.__defaults__), valuekey(f.__kwdefaults__)]
+    if f.__closure__:
+        cells = []
+        for cell in f.__closure__:
+            try:
+                cells.append(cell.cell_contents)
+            except ValueError:
+                # A cell that has not been filled in yet
+                cells.append(None)
+        parts.append(valuekey(cells))
+    return parts
+
+
+def identity(f, version=None):
+    # A string that names a function and what it computes. Functions that can not be keyed reliably
+    # are only accepted with a version, which then stands in for what they compute.
+    try:
+        parts = fingerprint(f)
+    except (ValueError, RecursionError):
+        # RecursionError: a closure that refers back to itself
+        if version is None:
+            raise ValueError("The results of " + repr(f) + " can not be keyed reliably, "
+                             "pass version= to Store.sweep to name them")
+        parts = [getattr(f, '__module__', ''), getattr(f, '__qualname__', type(f).__name__)]
+    return hashlib.sha256(repr([parts, version]).encode()).hexdigest()
+
+
+def plain(value):
+    # numpy scalars as python numbers, so the key does not depend on how they are printed
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (tuple, list)):
+        return tuple(plain(v) for v in value)
+    return value
+
+
+class Store:
+    # Arguments are:
+    # path - the SQLite file. It is made if it does not exist.
+    # maxrows - optional. The most results kept. Default is None, no limit.
+
+    def __init__(self, path, maxrows=None):
+        self.path = path
+        self.maxrows = maxrows
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (sweep TEXT, func TEXT, lam REAL, value REAL, used REAL, "
+                        "PRIMARY KEY (sweep, lam))")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self.db.commit()
+
+    def key(self, driver, f, args, version=None):
+        # The key shared by every lambda of one sweep
+        parts = [identity(driver), identity(f, version), valuekey(tuple(args)), version]
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def sweep(self, driver, f, lam, args=(), version=None):
+        # Inputs:
+        # driver - a sweep driver called as driver(f, lam, *args), e.g. simpson, gaussleg or sciquad
+        # f - function to be integrated
+        # lam - a vector of relevant parameter values
+        # args - optional. A tuple of the remaining arguments to the driver, e.g. (lower, upper, n)
+        # version - optional. Any string, kept in the key.
+
+        # Output:
+        # solution - vector of results, in the same order as lam
+        ###############################
+        lam = np.asarray(lam, dtype=float).ravel()
+        sweep = self.key(driver, f, args, version)
+
+        # Look up every lambda of this sweep that is already stored
+        known = dict(self.db.execute("SELECT lam, value FROM results WHERE sweep = ?", (sweep,)))
+        solution = np.array([known.get(l, np.nan) for l in lam.tolist()])
+        found = np.array([l in known for l in lam.tolist()], dtype=bool)
+        self.hits = self.hits + int(found.sum())
+        self.misses = self.misses + int((~found).sum())
+
+        # Compute the missing ones (each distinct lambda once) and store them
+        now = time.time()
+        if not found.all():
+            missing = np.unique(lam[~found])
+            values = np.asarray(driver(f, missing, *args), dtype=float)
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                                [(sweep, identity(f, version), l, v, now) for l, v in zip(missing.tolist(), values.tolist())])
+            solution[~found] = values[np.searchsorted(missing, lam[~found])]
+
+        # Mark the results that were used, so they are the last to be dropped
+        if found.any():
+            self.db.executemany("UPDATE results SET used = ? WHERE sweep = ? AND lam = ?",
+                                [(now, sweep, l) for l in np.unique(lam[found]).tolist()])
+        self.trim()
+        self.db.commit()
+
+        # The function returns a vector of results. each element of the vector is a different integral value
+        return solution
+
+    def trim(self):
+        # Drop the least recently used results while there are more than maxrows
+        if self.maxrows is None:
+            return
+        extra = self.rows() - self.maxrows
+        if extra > 0:
+            self.db.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY used LIMIT ?)",
+                            (extra,))
+
+    def rows(self):
+        # The number of results stored
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def invalidate(self, f, version=None):
+        # Drop every result of the integrand f (stored with the given version)
+        self.db.execute("DELETE FROM results WHERE func = ?", (identity(f, version),))
+        self.db.commit()
+
+    def clear(self):
+        # Drop every result
+        self.db.execute("DELETE FROM results")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
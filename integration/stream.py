@@ -0,0 +1,159 @@
+# This program is designed to run the sweep drivers (simpson, trapezoid, gaussleg, sciquad or sweep) over parameter
+# grids too large to hold in memory.
+#
+# stream reads lambda from any iterable (a generator, a file reader, a numpy array, ...) one chunk at a time,
+# and yields the results of each chunk as soon as they are computed:
+#     for start, values in stream(simpson, f, lamvalues, (0, np.inf, 1000)):
+#         ...
+# streamto writes the results straight into a memory-mapped .npy file, so neither lambda nor the results
+# have to fit in memory. After each chunk it records how far it got in a small file next to the output
+# (path + '.done'). If the run is interrupted, calling streamto again with the same arguments picks up after
+# the last completed chunk. The output can be opened afterwards with np.load(path, mmap_mode='r').
+# The progress file also records what the output was computed from: the driver, f and args (keyed as in store.py),
+# the number of values, and a hash of the lambda values done so far. Resuming with anything different raises a
+# ValueError, instead of mixing the old values with new ones. Remove the output (or pick another path) to start over.
+
+# Required Libraries:
+from __future__ import division
+import os
+import json
+import hashlib
+import itertools
+import numpy as np
+from store import identity, valuekey
+
+
+def chunks(lam, chunksize, start=0):
+    # Inputs:
+    # lam - an iterable of lambda values
+    # chunksize - the number of values in each chunk
+    # start - optional. The number of values to skip first. Default is 0.
+    # Output:
+    # a generator of vectors of (at most) chunksize values
+    ###################################################
+    if isinstance(lam, np.ndarray):
+        # Arrays (and memory-mapped arrays) are sliced directly, without reading the skipped values
+        lam = lam.ravel()
+        for i in range(start, len(lam), chunksize):
+            yield np.asarray(lam[i:i + chunksize], dtype=float)
+        return
+
+    values = iter(lam)
+    for skipped in itertools.islice(values, start):
+        pass
+    while True:
+        piece = np.fromiter(itertools.islice(values, chunksize), dtype=float)
+        if len(piece) == 0:
+            return
+        yield piece
+
+
+def stream(driver, f, lam, args=(), chunksize=10000, start=0):
+    # Inputs:
+    # driver - a sweep driver called as driver(f, lam, *args), e.g. simpson, gaussleg, sciquad or sweep
+    # f - function to be integrated
+    # lam - an iterable of lambda values
+    # args - optional. A tuple of the remaining arguments to the driver, e.g. (lower, upper, n)
+    # chunksize - optional. The number of lambda values sent to the driver at once. Default is 10000.
+    # start - optional. The number of lambda values to skip first. Default is 0.
+
+    # Output:
+    # a generator of (position, values) pairs: the results for lam[position:position + len(values)]
+    ###############################
+    position = start
+    for piece in chunks(lam, chunksize, start):
+        values = np.asarray(driver(f, piece, *args), dtype=float)
+        yield position, values
+        position = position + len(piece)
+
+
+def runkey(driver, f, args, total, version=None):
+    # A key for everything that decides the values of the output, other than lambda itself
+    parts = [identity(driver), identity(f, version), valuekey(tuple(args)), total, version]
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def progress(path):
+    # What has been written to the output at path: a dictionary with the number of lambda values done ('done'),
+    # the key of the run ('key') and the hash of the lambda values done ('lam'). None if nothing has been written.
+    try:
+        with open(path + '.done') as done:
+            record = json.load(done)
+    except (IOError, ValueError):
+        return None
+    if not isinstance(record, dict) or not {'done', 'key', 'lam'} <= set(record):
+        return None
+    return record
+
+
+def markdone(path, count, key, lamhash):
+    # Record that the first count values of the output are written. The file is replaced in one step,
+    # so an interruption never leaves it half written.
+    with open(path + '.done.tmp', 'w') as done:
+        json.dump({'done': count, 'key': key, 'lam': lamhash}, done)
+    os.replace(path + '.done.tmp', path + '.done')
+
+
+def streamto(driver, f, lam, path, args=(), chunksize=10000, total=None, version=None):
+    # Inputs:
+    # driver - a sweep driver called as driver(f, lam, *args), e.g. simpson, gaussleg, sciquad or sweep
+    # f - function to be integrated
+    # lam - an iterable of lambda values. Give the same values (in the same order) when resuming.
+    # path - the .npy file to write the results to
+    # args - optional. A tuple of the remaining arguments to the driver, e.g. (lower, upper, n)
+    # chunksize - optional. The number of lambda values computed (and saved) at once. Default is 10000.
+    # total - optional. The number of lambda values. Only needed when lam has no length, like a generator.
+    # version - optional. Any string, kept in the key (see store.py). Needed for integrands that can not be keyed.
+
+    # Output:
+    # solution - the results, as a memory-mapped array backed by the file at path
+    ###############################
+    if total is None:
+        total = len(lam)
+    key = runkey(driver, f, args, total, version)
+
+    # Carry on from an earlier run, or start a new output file
+    record = progress(path)
+    if record is not None and record['done'] > 0 and os.path.exists(path):
+        if record['key'] != key:
+            raise ValueError("The output file " + path + " was computed with a different driver, f, args or number "
+                             "of values. Remove it, or pick another path.")
+        solution = np.load(path, mmap_mode='r+')
+        if solution.shape != (total,):
+            raise ValueError("The output file " + path + " holds " + str(len(solution)) + " values, not " + str(total))
+        done = record['done']
+    else:
+        solution = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(total,))
+        done = 0
+
+    # Split lam into the values already done and the rest
+    if isinstance(lam, np.ndarray):
+        lam = lam.ravel()
+        head = chunks(lam[:done], chunksize)
+        rest = chunks(lam, chunksize, start=done)
+    else:
+        remaining = iter(lam)
+        head = chunks(itertools.islice(remaining, done), chunksize)
+        rest = chunks(remaining, chunksize)
+
+    # The values already done are read again (not computed), to check they are the ones the output was computed for
+    lamhash = hashlib.sha256()
+    for piece in head:
+        lamhash.update(piece.tobytes())
+    if done > 0 and lamhash.hexdigest() != record['lam']:
+        raise ValueError("The output file " + path + " was computed for different values of lambda. "
+                         "Remove it, or pick another path.")
+    if done == 0:
+        markdone(path, 0, key, lamhash.hexdigest())
+
+    position = done
+    for piece in rest:
+        values = np.asarray(driver(f, piece, *args), dtype=float)
+        solution[position:position + len(values)] = values
+        position = position + len(piece)
+        lamhash.update(piece.tobytes())
+        # Make sure the values are on disk before they are marked as done
+        solution.flush()
+        markdone(path, position, key, lamhash.hexdigest())
+
+    return solution
@@ -0,0 +1,175 @@
+# This program is designed to integrate a function over a whole vector of parameter values in one pass.
+# Instead of looping over lambda, the integrand is evaluated on a (lambda x nodes) grid using numpy
+# broadcasting, and the integrals are found with a single matrix-vector product.
+#
+# The integrand must accept arrays. It is called as f(x, parameters), where x is a (k x m) array of points
+# and parameters is a list of the fixed parameters with a (k x 1) column of lambda values inserted at lam_index.
+# So an integrand written like
+#     def f(x, p):
+#         return p[0]*np.exp(-p[1]*x)*x**p[2]
+# works unchanged, and returns a (k x m) array of functional values.
+
+# Required Libraries:
+from __future__ import division
+import numpy as np
+import scipy.integrate
+from nodes import legnodes
+from tail import subrule
+
+
+def rule(method, n):
+    # Inputs:
+    # method - one of 'simpson', 'trapezoid' or 'gaussleg'
+    # n - the number of "bins" (or sample points for 'gaussleg')
+    # Outputs:
+    # t - vector of sample points on [0, 1]
+    # w - vector of weights, scaled so that the integral over [a, b] is (b-a)*dot(w, f(a + (b-a)*t))
+    ###################################################
+
+    if method == 'simpson':
+        t = np.arange(n+1)/n
+        # End points receive a weight of 1, odd instances a weight of 4 and even instances a weight of 2
+        w = np.full(n+1, 2.0)
+        w[1:n:2] = 4
+        w[0] = 1
+        w[n] = 1
+        w = w/(3*n)
+    elif method == 'trapezoid':
+        t = np.arange(n+1)/n
+        # End points receive a weight of 0.5, every interior point a weight of 1
+        w = np.ones(n+1)
+        w[0] = 0.5
+        w[n] = 0.5
+        w = w/n
+    elif method == 'gaussleg':
+        # Move the Legendre points and weights from [-1, 1] to [0, 1]
+        x, w = legnodes(n)
+        t = (x+1)/2
+        w = w/2
+    else:
+        raise ValueError("Unknown method: " + str(method))
+
+    return t, w
+
+
+def lamparams(lam, params, lam_index):
+    # Inputs:
+    # lam - a vector of lambda values
+    # params - a tuple of the fixed parameters
+    # lam_index - the position of lambda in the parameter vector
+    # Output:
+    # parameters - a list of the fixed parameters, with lam inserted as a column vector
+    ###################################################
+
+    parameters = list(params)
+    parameters.insert(lam_index, np.asarray(lam, dtype=float).reshape(-1, 1))
+    return parameters
+
+
+def blockint(f, t, w, a, b, parameters):
+    # Inputs:
+    # f - function to be integrated
+    # t, w - sample points and weights from rule
+    # a - lower bound of integration, either one number or a vector with one lower bound for each row of the block
+    # b - a vector of upper bounds, one for each row of the block
+    # parameters - a list of parameters from lamparams
+    # Output:
+    # integral - a vector of integrals, one for each row of the block
+    ###################################################
+
+    b = np.asarray(b, dtype=float).reshape(-1, 1)
+    a = np.asarray(a, dtype=float).reshape(-1, 1)
+
+    # Every row of x is the grid of points for one value of lambda
+    x = a + (b - a)*t
+    f_x = np.asarray(f(x, parameters), dtype=float)
+    if f_x.shape != x.shape:
+        raise ValueError("The integrand must return one value per point, got shape " + str(f_x.shape)
+                         + " for points of shape " + str(x.shape))
+
+    # The integral for every row is the weighted sum of its functional values, times (b-a)
+    integral = (b - a)[:, 0]*np.dot(f_x, w)
+
+    return integral
+
+
+def sweep(f, lam, lower, upper, n, method='simpson', params=(0.04, 0.5), lam_index=1, chunksize=None, maxbytes=2**27,
+          tail='double', rtol=1e-6, maxiter=64):
+    # Inputs:
+    # f - function to be integrated, it must accept arrays (see notes at the top of this file)
+    # lam - a vector of relevant parameter values
+    # lower - lower bound of integration
+    # upper - upper bound of integration
+    # n - the number of "bins" to integrate over (ignored by 'sciquad')
+    # method - optional. 'simpson', 'trapezoid', 'gaussleg' or 'sciquad'. Default is 'simpson'.
+    # params - optional. A tuple of the fixed parameters. Default is (0.04, 0.5).
+    # lam_index - optional. The position of lambda in the parameter vector. Default is 1.
+    # chunksize - optional. The number of lambda values integrated together. Default is chosen from maxbytes.
+    # maxbytes - optional. Rough limit on the size of the (lambda x nodes) grid. Default is 128 MB.
+    # tail - optional. How an infinite upper bound is handled, 'double' or 'substitute' (see tail.py). Default is 'double'.
+    # rtol - optional. Relative tolerance for the 'double' tail search. Default is 1e-6.
+    # maxiter - optional. The maximum number of times b is doubled in the 'double' tail search. Default is 64.
+
+    # Output:
+    # solution - vector of results
+    ###############################
+
+    lam = np.asarray(lam, dtype=float).ravel()
+
+    # create an empty array to store results to
+    solution = np.zeros(len(lam))
+
+    if method != 'sciquad':
+        t, w = rule(method, n)
+
+    # Pick a chunk size so that the grid of points and functional values stays within maxbytes
+    if chunksize is None:
+        if method == 'sciquad':
+            chunksize = len(lam)
+        else:
+            chunksize = maxbytes//(2*8*len(t))
+    chunksize = max(int(chunksize), 1)
+
+    # Integrate the lambda values one chunk at a time
+    for start in range(0, len(lam), chunksize):
+        stop = min(start + chunksize, len(lam))
+        parameters = lamparams(lam[start:stop], params, lam_index)
+
+        if method == 'sciquad':
+            # scipy's quad_vec integrates the whole vector of lambda values at once, and handles infinite bounds
+            def g(x):
+                return np.asarray(f(x, parameters), dtype=float).ravel()
+            solution[start:stop] = scipy.integrate.quad_vec(g, lower, upper)[0]
+
+        # This takes care of infinite upper bound, by mapping [lower, inf) onto [0, 1]
+        elif (upper == np.inf) and tail == 'substitute':
+            x, v = subrule(t, w, lower)
+            f_x = np.asarray(f(np.zeros((stop - start, 1)) + x, parameters), dtype=float)
+            solution[start:stop] = np.dot(f_x, v)
+
+        # This takes care of infinite upper bound, by adding pieces [b, 2b]
+        elif (upper == np.inf):
+            # Each value of lambda keeps its own upper bound b. They all start at 50, and the piece [b, 2b]
+            # is added to the total until it no longer significantly changes the integral (at most maxiter times),
+            # just like tail.doubling.
+            b = np.full(stop - start, 50.0)
+            if lower >= 50:
+                b = b + lower
+            result = blockint(f, t, w, lower, b, parameters)
+            active = np.arange(stop - start)
+            for iteration in range(maxiter):
+                if active.size == 0:
+                    break
+                sub = lamparams(lam[start:stop][active], params, lam_index)
+                piece = blockint(f, t, w, b[active], 2*b[active], sub)
+                result[active] = result[active] + piece
+                b[active] = b[active]*2
+                # Only lambda values whose integral is still changing go through another round
+                active = active[abs(piece) > rtol*abs(result[active])]
+            solution[start:stop] = result
+
+        else:
+            solution[start:stop] = blockint(f, t, w, lower, np.full(stop - start, upper), parameters)
+
+    # The function returns a vector of results. each element of the vector is a different integral value
+    return solution
@@ -0,0 +1,84 @@
+# This program is designed to handle integrals with an infinite upper bound.
+# Two strategies are available:
+#
+# 'double' - integrate [a, b] and then keep adding the next piece [b, 2b], doubling b each time.
+#            Every piece is integrated exactly once, and the search stops when the newest piece is
+#            small relative to the running total.
+# 'substitute' - change variables with x = a + t/(1-t), which maps [a, inf) onto [0, 1).
+#            The whole integral is then found with one call to the rule over [0, 1], and no search is needed.
+#            This assumes the integrand falls off faster than 1/x**2, so the transformed integrand is 0 at t = 1.
+
+# Required Libraries:
+from __future__ import division
+import numpy as np
+
+
+def doubling(integrate, a, b=50, rtol=1e-6, atol=0, maxiter=64):
+    # Inputs:
+    # integrate - a function called as integrate(a, b) that returns the integral over [a, b]
+    # a - lower integration limit
+    # b - optional. The first upper bound tried. Default is 50.
+    # rtol - optional. Relative tolerance. The search stops when a new piece is below rtol times the total.
+    # atol - optional. Absolute tolerance, added to rtol times the total. Default is 0.
+    # maxiter - optional. The maximum number of times b is doubled. Default is 64.
+    # Outputs:
+    # total - the approximated value of the integral over [a, inf)
+    ###################################################
+
+    # Make sure the first interval is not empty
+    if b <= a:
+        b = a + b
+
+    total = integrate(a, b)
+
+    for iteration in range(maxiter):
+        # Only the new piece [b, 2b] is integrated, the total so far is carried forward
+        piece = integrate(b, 2*b)
+        total = total + piece
+        b = 2*b
+
+        # When the new piece no longer significantly changes the integral, then the loop breaks.
+        if not abs(piece) > rtol*abs(total) + atol:
+            break
+
+    return total
+
+
+def substitute(f, a):
+    # Inputs:
+    # f - the function being integrated over [a, inf), called as f(x, args)
+    # a - lower integration limit
+    # Outputs:
+    # g - the transformed function, to be integrated over [0, 1] and called as g(t, args)
+    ###################################################
+
+    def g(t, args):
+        t = np.asarray(t, dtype=float)
+        # Avoid evaluating f at infinity: t = 1 is replaced by 0, and its value is set to 0 below
+        inside = t < 1
+        s = np.where(inside, t, 0.0)
+        y = np.where(inside, np.asarray(f(a + s/(1-s), args), dtype=float)/(1-s)**2, 0.0)
+        if y.ndim == 0:
+            return float(y)
+        return y
+
+    return g
+
+
+def subrule(t, w, a):
+    # Inputs:
+    # t - vector of sample points on [0, 1]
+    # w - vector of weights for the points t
+    # a - lower integration limit
+    # Outputs:
+    # x - vector of sample points on [a, inf)
+    # v - vector of weights, so that the integral over [a, inf) is dot(v, f(x))
+    ###################################################
+
+    # The point t = 1 is mapped to infinity, where the integrand is taken to be 0, so it is dropped
+    inside = t < 1
+    s = t[inside]
+    x = a + s/(1-s)
+    v = w[inside]/(1-s)**2
+
+    return x, v
@@ -1,42 +1,81 @@
 # This program is designed to implement the Trapezoid Rule for numerical integration
 from __future__ import division
 import numpy as np
+import instrument
+from tail import doubling, substitute
+from memo import wrap
 
-def Tz(f, a, b, n, args):
+def Tz(f, a, b, n, args, vectorize=False):
 	# Inputs:
 	# f - the function being integrated
 	# a - lower integration limit
 	# b - upper integration limit
 	# n - the number of "bins" to integrate over
 	# args - a tuple of arguments to pass to f
+	# vectorize - optional. If True, f is called once on the whole grid of points. Default is False.
 
 	# Outputs:
 	# integral - the approximated value of the integral
 	###################################################
 
+	# Count and time the calls to f, if instrumentation is on (see instrument.py)
+	probe = instrument.start('Tz')
+	if probe is not None:
+		f = probe.wrap(f)
+
 	# Calculate the height of each trapezoid/bin
 	h = (b-a)/n
 
+	# Vectorized mode: evaluate f on every grid point at once and take the weighted sum with a dot product.
+	# If f cannot take an array, we fall through to the point by point loop below.
+	if vectorize:
+		x = a + np.arange(n+1)*h
+		try:
+			f_x = np.asarray(f(x, args), dtype=float)
+		except (TypeError, ValueError):
+			f_x = None
+		if probe is not None:
+			probe.lap('evaluate')
+		if f_x is not None and f_x.shape == x.shape:
+			# End points receive a weight of 0.5, every interior point a weight of 1
+			weights = np.ones(n+1)
+			weights[0] = 0.5
+			weights[n] = 0.5
+			integral = h*np.dot(weights, f_x)
+			if probe is not None:
+				probe.finish('sum')
+			return integral
+
 	s = 0.5*(f(a, args) + f(b, args))
 	for i in range(1,n):
 		s = s + f((a + (i*h)), args)
 
 	integral = h*s
+	if probe is not None:
+		probe.finish('evaluate')
 	return integral
 
 
-def trapezoid(f, lam, lower, upper, n):
+def trapezoid(f, lam, lower, upper, n, vectorize=False, tail='double', rtol=1e-6, cache=False):
 	# Inputs:
 	# f - function to be integrated
 	# lam - a vector of relevant parameter values
 	# lower - lower bound of integration
 	# upper - upper bound of integration
 	# n - the number of "bins" to integrate over
+	# vectorize - optional. Passed on to Tz. Default is False.
+	# tail - optional. How an infinite upper bound is handled, 'double' or 'substitute' (see tail.py). Default is 'double'.
+	# rtol - optional. Relative tolerance for the 'double' tail search. Default is 1e-6.
+	# cache - optional. If True, values of f are remembered, so repeated points are not evaluated again (see memo.py).
+	#         A number sets how many are kept. Default is False.
 
 	# Output:
 	# solution - vector of results
 	###############################
 
+	# Remember the values of f, if asked to
+	f = wrap(f, cache)
+
 	# create an empty array to store results to
 	solution = np.zeros(len(lam))
 
@@ -48,21 +87,14 @@ def trapezoid(f, lam, lower, upper, n):
 
 		# This takes care of infinite upper bound
 		if (upper == np.inf):
-			bdiff = 1
-			b_0 = 50
-			# While the difference between choices of b is still significant, we will continue to increase b
-			# When doubling b no longer significantly changes the integral, then the loop breaks.
-			while abs(bdiff) > .01:
-				b_1 = b_0*2
-				result_0 = Tz(f, lower, b_0, n, ptup)
-				result_1 = Tz(f, lower, b_1, n, ptup)
-				bdiff = result_1 - result_0
-				b_0 = b_1
+			# Either map [lower, inf) onto [0, 1] and integrate once, or keep adding pieces [b, 2b] until they stop mattering
+			if tail == 'substitute':
+				trapsol = Tz(substitute(f, lower), 0, 1, n, ptup, vectorize)
+			else:
+				trapsol = doubling(lambda a, b: Tz(f, a, b, n, ptup, vectorize), lower, rtol=rtol)
 		else:
-			b_1 = up
-
-		# Call tz function from above to find the value of the integral.
-		trapsol = Tz(f, lower, b_1, n, ptup)
+			# Call tz function from above to find the value of the integral.
+			trapsol = Tz(f, lower, upper, n, ptup, vectorize)
 
 		# Store results
 		solution[i] = trapsol
@@ -0,0 +1,133 @@
+# Program purpose: Run Gauss - Jacobi and Gauss - Seidel sweeps on several cores at once
+#
+################################## NOTES #################################################
+#  The unknowns are split into blocks of rows, and each block is updated by its own thread. The work in each
+#  block is a numpy / scipy.sparse product, which releases the GIL, so the threads really do run at the same time.
+#
+#  BlockJacobiSplit - Gauss - Jacobi. Every row only reads the old values, so all blocks can be updated together.
+#  ColorSeidelSplit - Multicolor Gauss - Seidel. The unknowns are colored so that no two unknowns of the same
+#                     color appear in the same equation. Colors are swept one after another, and all the unknowns
+#                     of one color are updated together, using the newest values of the other colors.
+#                     For the usual 5 point grid this is red-black ordering. Because the unknowns are visited in a
+#                     different order, the iterates differ from plain gs, but converge at a similar rate.
+#
+#  Both can be passed to gj / gs in place of coef, and are built once so the thread pool is reused:
+#      split = ColorSeidelSplit(coef, workers=8)
+#      x = gs(split, cons, inx, maxiter, tol)
+#      split.close()
+#  close() stops the threads of the pool once the split is no longer needed.
+##########################################################################################
+
+# Necessary Libraries:
+import concurrent.futures
+import numpy as np
+import scipy.sparse
+from cores import cores
+from coloring import greedycolor
+
+
+def rowblocks(rows, blocks):
+    # Split a vector of row numbers into (at most) the given number of contiguous pieces
+    return [piece for piece in np.array_split(rows, blocks) if len(piece) > 0]
+
+
+class BlockJacobiSplit:
+    # Gauss - Jacobi splitting, with the rows split into blocks that are updated in parallel.
+    # Arguments are:
+    # coef - the coefficient matrix of the linear system, dense or scipy.sparse.
+    # workers - optional. The number of threads. Default is every available core.
+    # blocks - optional. The number of row blocks. Default is one per thread.
+
+    def __init__(self, coef, workers=None, blocks=None):
+        if workers is None:
+            workers = cores()
+        if blocks is None:
+            blocks = workers
+        if scipy.sparse.issparse(coef):
+            self.coef = scipy.sparse.csr_matrix(coef)
+        else:
+            self.coef = np.asarray(coef, dtype=float)
+        self.d = self.coef.diagonal()
+
+        # Each block keeps its own slice of coef, so a thread only touches its own rows
+        self.blocks = [(rows[0], rows[-1] + 1) for rows in rowblocks(np.arange(self.coef.shape[0]), blocks)]
+        self.slices = [self.coef[start:stop] for start, stop in self.blocks]
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def solve(self, r):
+        # Solve D * y = r. r may be a vector or an (n x k) matrix.
+        if np.ndim(r) == 2:
+            return r / self.d[:, np.newaxis]
+        return r / self.d
+
+    def step(self, inx, cons):
+        # One Gauss - Jacobi iteration, with every block of rows computed by its own thread
+        outx = np.empty_like(inx)
+
+        def update(b):
+            start, stop = self.blocks[b]
+            r = cons[start:stop] - self.slices[b].dot(inx)
+            d = self.d[start:stop]
+            if np.ndim(r) == 2:
+                d = d[:, np.newaxis]
+            outx[start:stop] = inx[start:stop] + r / d
+
+        list(self.pool.map(update, range(len(self.blocks))))
+        return outx
+
+    def close(self):
+        # Stop the threads. The split can not be used after this.
+        self.pool.shutdown()
+
+
+class ColorSeidelSplit:
+    # Multicolor Gauss - Seidel splitting. Within a color, the rows are split into blocks that are updated in parallel.
+    # Arguments are:
+    # coef - the coefficient matrix of the linear system. It is stored as a scipy.sparse matrix.
+    # workers - optional. The number of threads. Default is every available core.
+    # colors - optional. A vector with the color (0, 1, 2, ...) of every unknown, for example (i + j) % 2 for
+    #          red-black ordering of an (i, j) grid. Default is found from coef by greedy coloring.
+    # blocks - optional. The number of row blocks per color. Default is one per thread.
+
+    def __init__(self, coef, workers=None, colors=None, blocks=None):
+        if workers is None:
+            workers = cores()
+        if blocks is None:
+            blocks = workers
+        self.coef = scipy.sparse.csr_matrix(coef, dtype=float)
+        self.d = self.coef.diagonal()
+        if colors is None:
+            # No two unknowns of the same color may appear in the same equation
+            colors = greedycolor(abs(self.coef) + abs(self.coef).T)
+        self.colors = np.asarray(colors)
+
+        # For every color, the row blocks and their slices of coef
+        self.sweeps = []
+        for c in np.unique(self.colors):
+            rows = np.flatnonzero(self.colors == c)
+            self.sweeps.append([(piece, self.coef[piece]) for piece in rowblocks(rows, blocks)])
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def step(self, inx, cons):
+        # One multicolor Gauss - Seidel iteration. Colors go one after the other, blocks of one color go together.
+        x = np.array(inx, dtype=float)
+
+        def update(block):
+            rows, A = block
+            r = cons[rows] - A.dot(x)
+            if np.ndim(r) == 2:
+                x[rows] = x[rows] + r / self.d[rows, np.newaxis]
+            else:
+                x[rows] = x[rows] + r / self.d[rows]
+
+        for sweep in self.sweeps:
+            list(self.pool.map(update, sweep))
+        return x
+
+    def solve(self, r):
+        # One multicolor Gauss - Seidel iteration from zero, so the split can be used as a preconditioner
+        return self.step(np.zeros_like(r, dtype=float), r)
+
+    def close(self):
+        # Stop the threads. The split can not be used after this.
+        self.pool.shutdown()
@@ -0,0 +1,49 @@
+# Program purpose: Show how the parallel Gauss - Jacobi and Gauss - Seidel sweeps scale with the number of threads.
+#
+# Times a fixed number of sweeps on a large sparse system (the shifted 5 point Laplacian from sparsebench.py)
+# with 1, 2, 4, ... threads, up to every available core, and prints the speedup and parallel efficiency.
+
+# Necessary Libraries:
+import os
+import sys
+import time
+import numpy as np
+
+# The modules shared by every folder are kept in ../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+from sparsebench import poisson
+from blocksplit import BlockJacobiSplit, ColorSeidelSplit
+from cores import cores
+
+
+def sweeps(split, cons, inx, count):
+    # Time count sweeps of a splitting
+    start = time.time()
+    for i in range(count):
+        inx = split.step(inx, cons)
+    return time.time() - start
+
+
+if __name__ == '__main__':
+    m = 1000
+    coef = poisson(m)
+    cons = np.ones(m * m)
+    inx = np.zeros(m * m)
+
+    # Red-black ordering of the (m x m) grid
+    i, j = np.divmod(np.arange(m * m), m)
+    redblack = (i + j) % 2
+
+    for name, build in [("Jacobi", lambda w: BlockJacobiSplit(coef, w)),
+                        ("Red-black Seidel", lambda w: ColorSeidelSplit(coef, w, redblack))]:
+        print("\n" + name + " on " + str(m * m) + " unknowns")
+        print("Threads   Seconds   Speedup   Efficiency")
+        workers = 1
+        while workers <= cores():
+            split = build(workers)
+            elapsed = sweeps(split, cons, inx, 20)
+            split.close()
+            if workers == 1:
+                base = elapsed
+            print("%7d %9.3f %9.2f %12.2f" % (workers, elapsed, base / elapsed, base / elapsed / workers))
+            workers = workers * 2
@@ -17,61 +17,142 @@
 #  This same form can be used in 3+ dimensions.
 #  
 #  If you have a linear systems of equations, write it in this matrix form before using ths python solver.
+#
+#  The coefficient matrix can also be a scipy.sparse matrix. It is then kept sparse the whole time,
+#  so each iteration costs time and memory in proportion to the number of nonzero coefficients.
+#
+#  To solve the same system for many constant vectors at once, pass cons as an (n x k) matrix with one
+#  constant vector per column. To reuse the splitting of coef across calls, build JacobiSplit(coef) once
+#  and pass it in place of coef.
 ##########################################################################################
 
-def gj(coef, cons, inx, maxiter, tol):
+# Necessary Libraries:
+import numpy as np
+import scipy.sparse
+from history import History
+import instrument
+
+
+class JacobiSplit:
+    # The Gauss - Jacobi splitting of a coefficient matrix, built once so it can be reused.
+    # Gauss - Jacobi solves D * outx = cons + (L + U) * inx on each iteration. Since coef = D - L - U, this is the same as
+    #   outx = inx + D^-1 * (cons - coef * inx)
+    # D is kept as the vector of diagonal coefficients, so its inverse is just 1/d and no (n x n) matrix is ever built.
+    # Arguments are:
+    # coef - the coefficient matrix of the linear system, dense or scipy.sparse.
+
+    def __init__(self, coef):
+        if scipy.sparse.issparse(coef):
+            self.coef = scipy.sparse.csr_matrix(coef)
+        else:
+            self.coef = np.asarray(coef, dtype=float)
+        self.d = self.coef.diagonal()
+
+    def solve(self, r):
+        # Solve D * y = r. r may be a vector or an (n x k) matrix.
+        if np.ndim(r) == 2:
+            return r / self.d[:, np.newaxis]
+        return r / self.d
+
+    def step(self, inx, cons):
+        # One Gauss - Jacobi iteration
+        return inx + self.solve(cons - self.coef.dot(inx))
+
+
+def gj(coef, cons, inx, maxiter, tol, history=True, callback=None):
     # Arguments are:
-    # coef - the coefficient matrix of the linear system.
-    # cons - the constant matrix of the linear system.
-    # inx - a vector containing the guesses for the variable values.
+    # coef - the coefficient matrix of the linear system, or a JacobiSplit of it (or a split from blocksplit.py).
+    # cons - the constant matrix of the linear system. Either a vector, or an (n x k) matrix of k constant vectors.
+    # inx - a vector containing the guesses for the variable values. For (n x k) cons, either one
+    #       vector used for every column, or an (n x k) matrix of guesses.
     # maxiter - the maximum iterations ran before ending the process.
     # tol - the tolerance level that must be satisfied for a solution to be found.
+    # history - optional. True records the norm at each iteration and prints the table at the end (default).
+    #           False records nothing. A History object (see history.py) is cleared and filled in and nothing is printed,
+    #           so the caller can look at it afterwards with .array() or .table().
+    # callback - optional. A function that receives each [iteration, norm] row as it is computed.
+    #           For (n x k) cons, the norm is the largest norm among the columns that have not converged yet.
+
+    # Time each phase, if instrumentation is on (see instrument.py)
+    probe = instrument.start('gj')
+
+    # coef may be a scipy.sparse matrix, in which case it is solved without ever making it dense.
+    # Generate the splitting, unless it was passed in
+    if hasattr(coef, 'step'):
+        # A JacobiSplit, or another splitting with a step method such as BlockJacobiSplit (see blocksplit.py)
+        split = coef
+    else:
+        split = JacobiSplit(coef)
 
-    # Generate DLU matrices
-    D = np.diag(np.diag(coef))
-    Dinv = np.linalg.inv(D)
-    L = np.tril(np.tril(coef, k=-1)) * (-1)
-    U = np.triu(np.triu(coef, k=1)) * (-1)
+    # Every column of cons is solved as its own system. A single vector is treated as one column.
+    cons = np.asarray(cons, dtype=float)
+    batched = cons.ndim == 2
+    cons = cons.reshape(len(cons), -1)
+    inx = np.array(inx, dtype=float).reshape(len(cons), -1)
+    if inx.shape[1] != cons.shape[1]:
+        inx = np.repeat(inx, cons.shape[1], axis=1)
+
+    # Columns that have not converged yet. Converged columns are frozen and no longer updated.
+    active = np.arange(cons.shape[1])
 
     # Set maximum iteration condition
-    iterations = range(1,maxiter + 1)
+    iterations = range(1, maxiter + 1)
 
-    # Create a Base table to append results to.
-    output = np.array([0, 0])
+    # Create a table, sized to maxiter, to store results to.
+    if isinstance(history, History):
+        output = history
+        output.reset(callback)
+    else:
+        output = History(maxiter, ["Iteration #", "Euclidean Norm"], record=history, callback=callback)
 
     # Create a boolean that will say if we found results or not.
     foundsolution = False
+    if probe is not None:
+        probe.lap('setup')
 
-    # Solve the system
     for iteration in iterations:
 
-        # Conduct Gauss - Jacobi Iteration
-        step1 = L + U
-        step2 = np.matmul(step1, inx)
-        step3 = cons + step2
-        outx = np.matmul(Dinv, step3)
+        # Conduct Gauss - Jacobi Iterations on the columns that are still active
+        if len(active) == cons.shape[1]:
+            cols = slice(None)
+        else:
+            cols = active
+        outx = split.step(inx[:, cols], cons[:, cols])
+        if probe is not None:
+            probe.lap('sweep')
 
-        # Calculate the difference between input and output & take euclidean norm
-        diff = outx - inx
-        norm = np.linalg.norm(diff, ord=2)
+        # Calculate the difference between input and output & take euclidean norm of each column
+        diff = outx - inx[:, cols]
+        norms = np.linalg.norm(diff, ord=2, axis=0)
+        norm = np.max(norms)
+        if probe is not None:
+            probe.lap('norm')
 
-        # Add it to our array
-        row = np.array([iteration, norm])
-        output = np.vstack([output, row])
+        # Add it to our table
+        output.add([iteration, norm])
+        if probe is not None:
+            probe.lap('history')
+            probe.iterate(norm)
 
         # The input for next iteration is equal to the output on the current iteration
-        inx = outx
+        inx[:, cols] = outx
+
+        # Columns whose euclidean norm is less than the tolerance level are done
+        active = active[~(norms < tol)]
 
-        # One of the end conditions: The euclidean norm is less than the tolerance level
-        if norm < tol:
+        # One of the end conditions: every column has converged
+        if len(active) == 0:
             print("\nA solution has been found during iteration " + str(iteration))
             foundsolution = True
-            iteration_table = pd.DataFrame(data=output[1:, 0:])
-            iteration_table.columns = ["Iteration #", "Euclidean Norm"]
             break
+    if probe is not None:
+        probe.finish()
     if foundsolution == True:
-        print("\nThe output at each iteration:")
-        print iteration_table
-        return inx
+        if history is True:
+            print("\nThe output at each iteration:")
+            print(output.table())
+        if batched:
+            return inx
+        return inx[:, 0]
     else:
         print("No solution was found in the given iterations")
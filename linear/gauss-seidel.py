@@ -17,60 +17,217 @@
 #  This same form can be used in 3+ dimensions.
 #  
 #  If you have a linear systems of equations, write it in this matrix form before using ths python solver.
+#
+#  The coefficient matrix can also be a scipy.sparse matrix. It is then kept sparse the whole time,
+#  so each iteration costs time and memory in proportion to the number of nonzero coefficients.
+#
+#  To solve the same system for many constant vectors at once, pass cons as an (n x k) matrix with one
+#  constant vector per column. To reuse the splitting of coef across calls, build SeidelSplit(coef) once
+#  and pass it in place of coef.
 ##########################################################################################
 
-def gs(coef, cons, inx, maxiter, tol):
+# Necessary Libraries:
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+import scipy.linalg
+from history import History
+import instrument
+
+
+class SeidelSplit:
+    # The Gauss - Seidel splitting of a coefficient matrix, built once so it can be reused.
+    # Gauss - Seidel solves (D - L) * outx = cons + U * inx on each iteration. Since coef = D - L - U, this is the same as
+    #   outx = inx + (D - L)^-1 * (cons - coef * inx)
+    # D - L is the lower triangle of coef, so instead of inverting it we do a triangular solve (forward substitution).
+    # This costs one pass over the nonzero coefficients per iteration, and no (n x n) matrix is ever built.
+    #
+    # Successive over-relaxation (SOR) with relaxation factor omega uses D/omega in place of D:
+    #   outx = inx + (D/omega - L)^-1 * (cons - coef * inx)
+    # omega = 1 is plain Gauss - Seidel. Symmetric SOR (SSOR) follows every forward sweep with a backward sweep,
+    # which solves with the upper triangle (D/omega - U) instead. The symmetric version can be used as a
+    # preconditioner for cg (see krylov.py).
+    # Arguments are:
+    # coef - the coefficient matrix of the linear system, dense or scipy.sparse.
+    # omega - optional. The relaxation factor, between 0 and 2. Default is 1.
+    # symmetric - optional. If True, use SSOR. Default is False.
+
+    def __init__(self, coef, omega=1.0, symmetric=False):
+        self.omega = omega
+        self.symmetric = symmetric
+        if scipy.sparse.issparse(coef):
+            self.coef = scipy.sparse.csr_matrix(coef)
+            Domega = scipy.sparse.diags(self.coef.diagonal() / omega)
+            self.DL = scipy.sparse.csr_matrix(scipy.sparse.tril(self.coef, k=-1) + Domega)
+            if symmetric:
+                self.DU = scipy.sparse.csr_matrix(scipy.sparse.triu(self.coef, k=1) + Domega)
+        else:
+            # The dense triangular solves only read one triangle of coef, so coef itself is used as D - L and D - U.
+            # With omega not 1, a single copy of coef with D/omega on the diagonal serves both.
+            self.coef = np.asarray(coef, dtype=float)
+            if omega == 1:
+                self.DL = self.coef
+            else:
+                self.DL = self.coef.copy()
+                np.fill_diagonal(self.DL, self.coef.diagonal() / omega)
+            self.DU = self.DL
+
+    def solve(self, r):
+        # Solve (D/omega - L) * y = r by forward substitution. r may be a vector or an (n x k) matrix.
+        # For SSOR, a backward sweep with (D/omega - U) follows.
+        if scipy.sparse.issparse(self.DL):
+            y = scipy.sparse.linalg.spsolve_triangular(self.DL, r, lower=True)
+        else:
+            y = scipy.linalg.solve_triangular(self.DL, r, lower=True, check_finite=False)
+        if self.symmetric:
+            r = r - self.coef.dot(y)
+            if scipy.sparse.issparse(self.DU):
+                y = y + scipy.sparse.linalg.spsolve_triangular(self.DU, r, lower=False)
+            else:
+                y = y + scipy.linalg.solve_triangular(self.DU, r, lower=False, check_finite=False)
+        return y
+
+    def step(self, inx, cons):
+        # One Gauss - Seidel (or SOR / SSOR) iteration
+        return inx + self.solve(cons - self.coef.dot(inx))
+
+
+def optimalomega(rho, symmetric=False):
+    # Estimate a near optimal relaxation factor from the observed Gauss - Seidel convergence rate rho.
+    # For the usual (consistently ordered) systems, the Jacobi rate is sqrt(rho), and the best SOR factor
+    # is 2 / (1 + sqrt(1 - rho)). For SSOR the common estimate is 2 / (1 + sqrt(2 * (1 - sqrt(rho)))).
+    if not 0 < rho < 1:
+        return 1.0
+    if symmetric:
+        return 2 / (1 + np.sqrt(2 * (1 - np.sqrt(rho))))
+    return 2 / (1 + np.sqrt(1 - rho))
+
+
+def gs(coef, cons, inx, maxiter, tol, history=True, callback=None, omega=1.0, symmetric=False, tune=100):
     # Arguments are:
-    # coef - the coefficient matrix of the linear system.
-    # cons - the constant matrix of the linear system.
-    # inx - a vector containing the guesses for the variable values.
+    # coef - the coefficient matrix of the linear system, or a SeidelSplit of it (or a split from blocksplit.py).
+    # cons - the constant matrix of the linear system. Either a vector, or an (n x k) matrix of k constant vectors.
+    # inx - a vector containing the guesses for the variable values. For (n x k) cons, either one
+    #       vector used for every column, or an (n x k) matrix of guesses.
     # maxiter - the maximum iterations ran before ending the process.
     # tol - the tolerance level that must be satisfied for a solution to be found.
+    # history - optional. True records the norm at each iteration and prints the table at the end (default).
+    #           False records nothing. A History object (see history.py) is cleared and filled in and nothing is printed,
+    #           so the caller can look at it afterwards with .array() or .table().
+    # callback - optional. A function that receives each [iteration, norm] row as it is computed.
+    #           For (n x k) cons, the norm is the largest norm among the columns that have not converged yet.
+    # omega - optional. The SOR relaxation factor. Default is 1 (plain Gauss - Seidel). 'auto' starts with plain
+    #         Gauss - Seidel, estimates the best omega from how fast the norm falls, and then switches to SOR with it.
+    # symmetric - optional. If True, use SSOR. Default is False.
+    # tune - optional. The most iterations spent estimating omega when omega is 'auto'. Default is 100.
+    # omega and symmetric are ignored if coef is already a SeidelSplit, unless omega is 'auto'.
+    # omega = 'auto' can not be used with the splits from blocksplit.py.
+
+    # Time each phase, if instrumentation is on (see instrument.py)
+    probe = instrument.start('gs')
+
+    # coef may be a scipy.sparse matrix, in which case it is solved without ever making it dense.
+    # Generate the splitting, unless it was passed in
+    if isinstance(coef, SeidelSplit):
+        split = coef
+        if omega == 'auto':
+            split = SeidelSplit(coef.coef)
+    elif hasattr(coef, 'step'):
+        # Another splitting with a step method, such as ColorSeidelSplit (see blocksplit.py).
+        # Tuning would have to replace it with a SeidelSplit, losing the ordering it was built with.
+        if omega == 'auto':
+            raise ValueError("omega = 'auto' needs coef to be a matrix or a SeidelSplit, not " + type(coef).__name__)
+        split = coef
+    elif omega == 'auto':
+        split = SeidelSplit(coef)
+    else:
+        split = SeidelSplit(coef, omega, symmetric)
+
+    # Every column of cons is solved as its own system. A single vector is treated as one column.
+    cons = np.asarray(cons, dtype=float)
+    batched = cons.ndim == 2
+    cons = cons.reshape(len(cons), -1)
+    inx = np.array(inx, dtype=float).reshape(len(cons), -1)
+    if inx.shape[1] != cons.shape[1]:
+        inx = np.repeat(inx, cons.shape[1], axis=1)
 
-    # Generate DLU matrices
-    D = np.diag(np.diag(coef))
-    L = np.tril(np.tril(coef, k=-1)) * (-1)
-    DL = D - L
-    DLinv = np.linalg.inv(DL)
-    U = np.triu(np.triu(coef, k=1)) * (-1)
+    # With omega = 'auto', start with plain Gauss - Seidel and keep the norms needed to estimate omega
+    tuning = omega == 'auto'
+    recent = []
+
+    # Columns that have not converged yet. Converged columns are frozen and no longer updated.
+    active = np.arange(cons.shape[1])
 
     # Set maximum iteration condition
     iterations = range(1, maxiter + 1)
 
-    # Create a Base table to append results to.
-    output = np.array([0, 0])
+    # Create a table, sized to maxiter, to store results to.
+    if isinstance(history, History):
+        output = history
+        output.reset(callback)
+    else:
+        output = History(maxiter, ["Iteration #", "Euclidean Norm"], record=history, callback=callback)
 
     # Create a boolean that will say if we found results or not.
     foundsolution = False
+    if probe is not None:
+        probe.lap('setup')
 
     for iteration in iterations:
 
-        # Conduct Gauss - Jacobi Iterations
-        step1 = np.matmul(U, inx)
-        step2 = cons + step1
-        outx = np.matmul(DLinv, step2)
+        # Conduct Gauss - Seidel Iterations on the columns that are still active
+        if len(active) == cons.shape[1]:
+            cols = slice(None)
+        else:
+            cols = active
+        outx = split.step(inx[:, cols], cons[:, cols])
+        if probe is not None:
+            probe.lap('sweep')
 
-        # Calculate the difference between input and output & take euclidean norm
-        diff = outx - inx
-        norm = np.linalg.norm(diff, ord=2)
+        # Calculate the difference between input and output & take euclidean norm of each column
+        diff = outx - inx[:, cols]
+        norms = np.linalg.norm(diff, ord=2, axis=0)
+        norm = np.max(norms)
+        if probe is not None:
+            probe.lap('norm')
 
-        # Add it to our array
-        row = np.array([iteration, norm])
-        output = np.vstack([output, row])
+        # Add it to our table
+        output.add([iteration, norm])
+        if probe is not None:
+            probe.lap('history')
+            probe.iterate(norm)
+
+        # With omega = 'auto', the Gauss - Seidel convergence rate is measured over the last 3 iterations. Once it is
+        # steady (or tune iterations have run), omega is estimated from it and the solver switches to SOR / SSOR.
+        if tuning:
+            recent.append(norm)
+            if len(recent) >= 7:
+                rate = (recent[-1] / recent[-4]) ** (1 / 3)
+                before = (recent[-4] / recent[-7]) ** (1 / 3)
+                if abs(rate - before) < 0.02 * (1 - rate) or iteration >= tune:
+                    split = SeidelSplit(split.coef, optimalomega(rate, symmetric), symmetric)
+                    tuning = False
+                    print("\nThe relaxation factor has been set to " + str(split.omega))
 
         # The input for next iteration is equal to the output on the current iteration
-        inx = outx
+        inx[:, cols] = outx
+
+        # Columns whose euclidean norm is less than the tolerance level are done
+        active = active[~(norms < tol)]
 
-        # One of the end conditions: The euclidean norm is less than the tolerance level
-        if norm < tol:
+        # One of the end conditions: every column has converged
+        if len(active) == 0:
             print("\nA solution has been found during iteration " + str(iteration))
             foundsolution = True
-            iteration_table = pd.DataFrame(data=output[1:, 0:])
-            iteration_table.columns = ["Iteration #", "Euclidean Norm"]
             break
+    if probe is not None:
+        probe.finish()
     if foundsolution == True:
-        print("\nThe output at each iteration:")
-        print iteration_table
-        return inx
+        if history is True:
+            print("\nThe output at each iteration:")
+            print(output.table())
+        if batched:
+            return inx
+        return inx[:, 0]
     else:
         print("No solution was found in the given iterations")
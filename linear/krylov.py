@@ -0,0 +1,240 @@
+# Program purpose: Solve a linear system of equations using Krylov subspace methods
+#
+################################## NOTES #################################################
+#  These solvers take the same arguments as gj and gs, and use the same end condition: the euclidean norm
+#  of the change in the variables between two iterations must be less than the tolerance level.
+#
+#  cg - Conjugate Gradient. Only for symmetric positive definite coefficient matrices.
+#  gmres - Restarted GMRES (Generalized Minimal RESidual). For any nonsingular coefficient matrix.
+#
+#  Both accept a preconditioner, which makes the system easier to solve:
+#   'jacobi' - uses the Gauss - Jacobi splitting, D^-1 (see gauss-jacobi.py)
+#   'seidel' - uses the Gauss - Seidel splitting, (D - L)^-1 (see gauss-seidel.py). It is not symmetric,
+#              so it should only be used with gmres.
+#  or any object with a solve(r) method, like a JacobiSplit or SeidelSplit that was already built.
+#  SeidelSplit(coef, omega, symmetric=True) is the symmetric SOR (SSOR) preconditioner, which can be used with cg.
+#
+#  The coefficient matrix can be dense or a scipy.sparse matrix.
+##########################################################################################
+
+# Necessary Libraries:
+import importlib
+import numpy as np
+import scipy.sparse
+import scipy.linalg
+from history import History
+
+# The splitting files have dashes in their names, so they are loaded with importlib
+JacobiSplit = importlib.import_module('gauss-jacobi').JacobiSplit
+SeidelSplit = importlib.import_module('gauss-seidel').SeidelSplit
+
+
+def preconditioner(coef, precond):
+    # Turn the precond argument into an object with a solve(r) method, or None
+    if precond is None:
+        return None
+    elif precond == 'jacobi':
+        return JacobiSplit(coef)
+    elif precond == 'seidel':
+        return SeidelSplit(coef)
+    return precond
+
+
+def cg(coef, cons, inx, maxiter, tol, precond=None, history=True, callback=None):
+    # Arguments are:
+    # coef - the coefficient matrix of the linear system. Must be symmetric positive definite.
+    # cons - the constant matrix of the linear system.
+    # inx - a vector containing the guesses for the variable values.
+    # maxiter - the maximum iterations ran before ending the process.
+    # tol - the tolerance level that must be satisfied for a solution to be found.
+    # precond - optional. None, 'jacobi', or an object with a solve(r) method. Default is None.
+    # history - optional. Same as in gj and gs.
+    # callback - optional. A function that receives each [iteration, norm] row as it is computed.
+
+    if scipy.sparse.issparse(coef):
+        coef = scipy.sparse.csr_matrix(coef)
+    else:
+        coef = np.asarray(coef, dtype=float)
+    M = preconditioner(coef, precond)
+
+    # Create a table, sized to maxiter, to store results to.
+    if isinstance(history, History):
+        output = history
+        output.reset(callback)
+    else:
+        output = History(maxiter, ["Iteration #", "Euclidean Norm"], record=history, callback=callback)
+
+    # Starting residual, preconditioned residual and search direction
+    x = np.array(inx, dtype=float)
+    r = cons - coef.dot(x)
+    if M is None:
+        z = r
+    else:
+        z = M.solve(r)
+    p = z.copy()
+    rz = np.dot(r, z)
+
+    # Create a boolean that will say if we found results or not.
+    foundsolution = False
+
+    for iteration in range(1, maxiter + 1):
+
+        # Move along the search direction p as far as it lowers the error
+        Ap = coef.dot(p)
+        if rz == 0:
+            alpha = 0.0
+        else:
+            alpha = rz / np.dot(p, Ap)
+        step = alpha * p
+        x = x + step
+        r = r - alpha * Ap
+
+        # The euclidean norm of the change in x
+        norm = np.linalg.norm(step, ord=2)
+
+        # Add it to our table
+        output.add([iteration, norm])
+
+        # One of the end conditions: The euclidean norm is less than the tolerance level
+        if norm < tol:
+            print("\nA solution has been found during iteration " + str(iteration))
+            foundsolution = True
+            break
+
+        # The next search direction is conjugate to all the ones before it
+        if M is None:
+            z = r
+        else:
+            z = M.solve(r)
+        rznew = np.dot(r, z)
+        p = z + (rznew / rz) * p
+        rz = rznew
+
+    if foundsolution == True:
+        if history is True:
+            print("\nThe output at each iteration:")
+            print(output.table())
+        return x
+    else:
+        print("No solution was found in the given iterations")
+
+
+def gmres(coef, cons, inx, maxiter, tol, precond=None, restart=20, history=True, callback=None):
+    # Arguments are:
+    # coef - the coefficient matrix of the linear system.
+    # cons - the constant matrix of the linear system.
+    # inx - a vector containing the guesses for the variable values.
+    # maxiter - the maximum iterations ran before ending the process.
+    # tol - the tolerance level that must be satisfied for a solution to be found.
+    # precond - optional. None, 'jacobi', 'seidel', or an object with a solve(r) method. Default is None.
+    # restart - optional. The number of iterations before the Krylov basis is thrown away and started again. Default is 20.
+    # history - optional. Same as in gj and gs.
+    # callback - optional. A function that receives each [iteration, norm] row as it is computed.
+
+    if scipy.sparse.issparse(coef):
+        coef = scipy.sparse.csr_matrix(coef)
+    else:
+        coef = np.asarray(coef, dtype=float)
+    M = preconditioner(coef, precond)
+
+    def Msolve(r):
+        # Apply the preconditioner from the left
+        if M is None:
+            return r
+        return M.solve(r)
+
+    # Create a table, sized to maxiter, to store results to.
+    if isinstance(history, History):
+        output = history
+        output.reset(callback)
+    else:
+        output = History(maxiter, ["Iteration #", "Euclidean Norm"], record=history, callback=callback)
+
+    x = np.array(inx, dtype=float)
+    n = len(x)
+    m = restart
+    iteration = 0
+
+    # Create a boolean that will say if we found results or not.
+    foundsolution = False
+
+    while iteration < maxiter:
+        # Start a new Krylov basis from the preconditioned residual
+        r = Msolve(cons - coef.dot(x))
+        beta = np.linalg.norm(r, ord=2)
+        if beta == 0:
+            # The guess already solves the system
+            foundsolution = True
+            break
+
+        V = np.zeros((m + 1, n))
+        H = np.zeros((m + 1, m))
+        cs = np.zeros(m)
+        sn = np.zeros(m)
+        g = np.zeros(m + 1)
+        V[0] = r / beta
+        g[0] = beta
+        yprev = np.zeros(0)
+
+        for j in range(m):
+            iteration = iteration + 1
+
+            # Extend the basis with the next (orthonormalized) Krylov vector
+            w = Msolve(coef.dot(V[j]))
+            for i in range(j + 1):
+                H[i, j] = np.dot(w, V[i])
+                w = w - H[i, j] * V[i]
+            H[j + 1, j] = np.linalg.norm(w, ord=2)
+            if H[j + 1, j] != 0:
+                V[j + 1] = w / H[j + 1, j]
+
+            # Keep H upper triangular with Givens rotations
+            for i in range(j):
+                temp = cs[i] * H[i, j] + sn[i] * H[i + 1, j]
+                H[i + 1, j] = -sn[i] * H[i, j] + cs[i] * H[i + 1, j]
+                H[i, j] = temp
+            denom = np.hypot(H[j, j], H[j + 1, j])
+            if denom == 0:
+                cs[j], sn[j] = 1.0, 0.0
+            else:
+                cs[j], sn[j] = H[j, j] / denom, H[j + 1, j] / denom
+            breakdown = H[j + 1, j] == 0
+            H[j, j] = denom
+            H[j + 1, j] = 0
+            g[j + 1] = -sn[j] * g[j]
+            g[j] = cs[j] * g[j]
+
+            # x = x0 + V * y. Since the rows of V are orthonormal, the change in x since the
+            # last iteration has the same euclidean norm as the change in y.
+            y = scipy.linalg.solve_triangular(H[:j + 1, :j + 1], g[:j + 1], check_finite=False)
+            norm = np.linalg.norm(y - np.append(yprev, 0), ord=2)
+            yprev = y
+
+            # The rotations also give the norm of the (preconditioned) residual, without computing it.
+            # When GMRES stagnates, y barely changes although the residual is large, so both must be small.
+            residual = abs(g[j + 1])
+
+            # Add it to our table
+            output.add([iteration, norm])
+
+            # End of this cycle: converged, the basis can not grow any more, or out of iterations
+            if (norm < tol and residual < tol) or breakdown or iteration == maxiter:
+                break
+
+        x = x + np.dot(V[:j + 1].T, y)
+
+        # One of the end conditions: The euclidean norm is less than the tolerance level, and so is the residual.
+        # The residual from the rotations can drift from the true one, so it is checked directly before stopping.
+        if norm < tol and residual < tol:
+            if np.linalg.norm(Msolve(cons - coef.dot(x)), ord=2) < tol:
+                foundsolution = True
+                break
+
+    if foundsolution == True:
+        print("\nA solution has been found during iteration " + str(iteration))
+        if history is True:
+            print("\nThe output at each iteration:")
+            print(output.table())
+        return x
+    else:
+        print("No solution was found in the given iterations")
@@ -0,0 +1,57 @@
+# Program purpose: Compare the dense and sparse paths of gj and gs on growing grids.
+#
+# The test problem is the 5 point finite difference Laplacian on an (m x m) grid, shifted so that it is
+# strictly diagonally dominant and both methods converge. It has n = m**2 unknowns and about 5 nonzeros per row.
+# The dense path is only run while n is small enough for an (n x n) array to be reasonable.
+
+# Necessary Libraries:
+import os
+import sys
+import io
+import time
+import contextlib
+import importlib
+import numpy as np
+import scipy.sparse
+
+# The modules shared by every folder are kept in ../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+
+# The solver files have dashes in their names, so they are loaded with importlib
+gj = importlib.import_module('gauss-jacobi').gj
+gs = importlib.import_module('gauss-seidel').gs
+
+
+def poisson(m, shift=1.0):
+    # Build the shifted 5 point Laplacian on an (m x m) grid as a CSR matrix
+    T = scipy.sparse.diags([-1.0, 4.0 + shift, -1.0], [-1, 0, 1], shape=(m, m))
+    S = scipy.sparse.diags([-1.0, -1.0], [-1, 1], shape=(m, m))
+    I = scipy.sparse.identity(m)
+    return scipy.sparse.csr_matrix(scipy.sparse.kron(I, T) + scipy.sparse.kron(S, I))
+
+
+def timed(solver, coef, cons, inx):
+    # Run a solver quietly and return the solution and the wall time
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        x = solver(coef, cons, inx, 500, 1e-8)
+    return x, time.time() - start
+
+
+if __name__ == '__main__':
+    print("\nSolver         n    Dense (s)   Sparse (s)")
+    for m in [10, 20, 40, 60, 100, 300, 1000]:
+        n = m*m
+        coef = poisson(m)
+        cons = np.ones(n)
+        inx = np.zeros(n)
+
+        for name, solver in [("gj", gj), ("gs", gs)]:
+            xs, sparse = timed(solver, coef, cons, inx)
+            if n <= 3600:
+                xd, dense = timed(solver, coef.toarray(), cons, inx)
+                # Both paths must give the same answer
+                assert np.allclose(xd, xs)
+                print("%-6s %9d %12.4f %12.4f" % (name, n, dense, sparse))
+            else:
+                print("%-6s %9d %12s %12.4f" % (name, n, "-", sparse))
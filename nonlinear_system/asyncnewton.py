@@ -0,0 +1,137 @@
+# ------------------------------------------------------------------------------------------------------ #
+# Purpose: Script defining the Newton-Raphson method for systems whose function waits on something else, #
+#          such as a simulation server, instead of computing.                                            #
+# ------------------------------------------------------------------------------------------------------ #
+#
+# F can be a coroutine function:
+#     async def F(x):
+#         return await client.evaluate(x)
+# (plain functions work too). The evaluations of F for the columns of the finite difference Jacobian do not
+# depend on each other, so they are all requested at once. limit caps the number of calls to F waiting at the
+# same time. aNR is a coroutine, and is run with asyncio:
+#     solution, results = asyncio.run(aNR(F, init, limit=8))
+# To test F against a mock server, start one with asyncio.start_server in the same event loop
+# (integration/asyncbench.py does this).
+
+# Necessary Libraries:
+import inspect
+import asyncio
+import numpy as np
+import jacobian
+from history import History
+
+
+async def call(F, x, gate):
+    # Call F(x), waiting for a free slot first. F may be a coroutine function or a plain function.
+    async with gate:
+        value = F(x)
+        if inspect.isawaitable(value):
+            value = await value
+    return np.asarray(value, dtype=float)
+
+
+async def ajacobian(F, x, Fx, gate, central=False):
+    # The forward (or central) difference Jacobian, with every evaluation of F requested at once
+    h = jacobian.steps(x, central)
+    points = []
+    for j in range(len(x)):
+        xp = x.copy()
+        xp[j] = xp[j] + h[j]
+        points.append(xp)
+        if central:
+            xm = x.copy()
+            xm[j] = xm[j] - h[j]
+            points.append(xm)
+    Fs = await asyncio.gather(*[call(F, p, gate) for p in points])
+
+    if central:
+        columns = [(Fs[2*j] - Fs[2*j + 1]) / (2 * h[j]) for j in range(len(x))]
+    else:
+        columns = [(Fs[j] - Fx) / h[j] for j in range(len(x))]
+    return np.column_stack(columns)
+
+
+# Define aNR (asynchronous Newton-Raphson) function
+async def aNR(F, x, tol = 0.000001, maxiter = 50, history = True, callback = None, jac = 'forward', limit = 8):
+    # Newton - Raphson Algorithm
+    # Inputs:
+    # F - a function, or coroutine function. Defines the function(s) of the system, length = n.
+    # x - list/array. initial guess for variables. length = n
+    # tol - numeric. The error tolerance level. Default is 1e-6
+    # maxiter - numeric. Number of maximum iterations to run algorithm. Default is 50.
+    # history - optional. Same as in NR.
+    # callback - optional. Same as in NR.
+    # jac - optional. 'forward' (default) or 'central' differences, or a function (or coroutine function) called as jac(x).
+    # limit - optional. The most calls to F waiting at the same time. Default is 8.
+
+    # Output:
+    # solution - vector of length n which solves the system
+    # nrout - data frame with information on norms and iteration number (or the History object, or None).
+    ###############################################################################
+
+    x = np.asarray(x, dtype=float)
+    gate = asyncio.Semaphore(limit)
+
+    # Generate a dummy variable equal to zero. Dummy will be set to 1 if a solution is found.
+    sol_found = 0
+
+    # Create a table, sized to maxiter, to store results to
+    names = ["Iteration #", "F norm", "D norm"] + ['X_'+str(i) for i in range(len(x))]
+    if isinstance(history, History):
+        results = history
+        results.reset(callback)
+    else:
+        results = History(maxiter, names, record=history, callback=callback)
+
+    # Loop for Newton-Raphson Algorithm
+    for iteration in range(1, maxiter + 1):
+
+        # Step 2: Evaluate function at x, called Fval, and its Euclidean norm
+        Fval = await call(F, x, gate)
+        fnorm = np.linalg.norm(Fval, ord=2) # ord = 2 for Euclidean norm
+
+        # Step 3: Compute the Jacobian Matrix
+        if callable(jac):
+            jmat = jac(x)
+            if inspect.isawaitable(jmat):
+                jmat = await jmat
+        elif jac in ('forward', 'central'):
+            jmat = await ajacobian(F, x, Fval, gate, central=(jac == 'central'))
+        else:
+            raise ValueError("Unknown Jacobian method: " + str(jac))
+
+        # Step 4: Solve for delta
+        delta = np.linalg.solve(jmat, -1*Fval)
+        dnorm = np.linalg.norm(delta, ord = 2) # ord = 2 for Euclidean norm
+
+        # Store iteration results
+        row = np.zeros(len(x)+3)
+        row[0] = iteration
+        row[1] = fnorm
+        row[2] = dnorm
+        row[3:] = x
+        results.add(row)
+
+        # Stopping condition 1:
+        if abs(fnorm) < tol:
+            solution = x
+            sol_found = 1
+            break
+        # Stopping condition 2:
+        elif abs(dnorm) < tol:
+            solution = x
+            sol_found = 1
+            break
+        # If neither stopping condition is met, repeat steps 2 - 5 with updated x
+        # Update x
+        x = x + delta
+
+    if sol_found == 1:
+        if history is True:
+            return solution, results.table()
+        elif history is False:
+            return solution, None
+        return solution, results
+    else:
+        print("Could not find a solution with given parameters.")
+        return results.array()
@@ -0,0 +1,137 @@
+# ------------------------------------------------------------------------------------------------------ #
+# Purpose: Script defining a continuation (path following) solver, built on the Newton-Raphson function. #
+# ------------------------------------------------------------------------------------------------------ #
+#
+# When a system F(x, lam) = 0 is solved for many values of a parameter lam that change smoothly, the solution
+# for one value is a very good starting point for the next. Each solve starts from a prediction of where the
+# solution has moved to:
+#   'tangent' - x + dx/dlam * step, where dx/dlam = -J^-1 * dF/dlam uses the last Jacobian from NR (default).
+#   'secant' - a straight line through the last two solutions.
+#   None - the last solution itself.
+# If NR fails, or is slow, from the prediction, the step in lam is cut in half and smaller steps are taken on the
+# way to the next value of lam. When NR converges quickly, the step is allowed to grow again.
+
+# Necessary Libraries:
+import numpy as np
+import jacobian
+from newtonraphson import NR
+from history import History
+
+
+def tangent(F, x, lam, jmat):
+    # Inputs:
+    # F - a function, called as F(x, lam).
+    # x - vector. A solution of F(x, lam) = 0.
+    # lam - numeric. The parameter value.
+    # jmat - the Jacobian of F with respect to x, at x.
+
+    # Output:
+    # dx - vector. The derivative of the solution with respect to lam.
+    ###############################################################################
+    h = np.sqrt(jacobian.eps) * max(abs(lam), 1)
+    dF = (np.asarray(F(x, lam + h), dtype=float) - np.asarray(F(x, lam), dtype=float)) / h
+    return -1*jacobian.factor(jmat)(dF)
+
+
+def continuation(F, x, lam, tol = 0.000001, maxiter = 50, predictor = 'tangent', fast = 2, minstep = 0.000001,
+                 jac = None, mode = 'newton'):
+    # Inputs:
+    # F - a function, called as F(x, lam). Defines the function(s) of the system, length = n.
+    # x - list/array. Initial guess for the variables at the first value of lam. length = n
+    # lam - vector. The parameter values to solve for, in the order they are visited.
+    # tol - numeric. The error tolerance level, passed on to NR. Default is 1e-6
+    # maxiter - numeric. Maximum iterations for each call to NR. Default is 50.
+    # predictor - optional. 'tangent' (default), 'secant' or None, see above.
+    # fast - optional. If NR converges within this many iterations, the step in lam is doubled,
+    #        and if it takes more than twice as many, the step is halved. Default is 2.
+    # minstep - optional. The smallest step, relative to the distance between two values of lam, before giving up.
+    #           Default is 1e-6.
+    # jac - optional. Passed on to NR. An analytic Jacobian is called as jac(x, lam).
+    # mode - optional. Passed on to NR.
+
+    # Output:
+    # solution - (len(lam) x n) matrix. The solution for each value of lam, one per row. Rows after a failure are NaN.
+    # path - data frame with the number of steps, Newton iterations and F evaluations used to reach each value of lam.
+    ###############################################################################
+    lam = np.asarray(lam, dtype=float)
+    x = np.array(x, dtype=float)
+    solution = np.full((len(lam), len(x)), np.nan)
+    path = History(len(lam), ["Lambda", "Steps", "Newton iterations", "F evaluations"])
+
+    def solve(xguess, l):
+        # Run NR at a fixed value of lam. Returns the solution (None if it failed) and the NR stats.
+        stats = {}
+        if callable(jac):
+            jl = lambda y: jac(y, l)
+        else:
+            jl = jac
+        out = NR(lambda y: F(y, l), xguess, tol, maxiter, history=False, jac=jl, mode=mode, stats=stats)
+        if isinstance(out, tuple):
+            return out[0], stats
+        return None, stats
+
+    # The first value of lam is solved from the initial guess
+    x, stats = solve(x, lam[0])
+    if x is None:
+        print("Could not find a solution at the first value of lambda.")
+        return solution, path.table()
+    solution[0] = x
+    path.add([lam[0], 1, stats['iterations'], stats['F evaluations']])
+
+    current = lam[0]
+    jmat = stats['jacobian']
+    previous = None
+    step = None
+    for i in range(1, len(lam)):
+        gap = lam[i] - lam[i - 1]
+        if step is None:
+            step = abs(gap)
+        steps = 0
+        iterations = 0
+        evaluations = 0
+
+        # Take steps in lam until this value is reached
+        while current != lam[i]:
+            if abs(lam[i] - current) <= step:
+                target = lam[i]
+            else:
+                target = current + np.sign(gap) * step
+
+            # Predict the solution at the target
+            if predictor == 'tangent':
+                dx = tangent(F, x, current, jmat)
+                evaluations = evaluations + 2
+                guess = x + dx * (target - current)
+            elif predictor == 'secant' and previous is not None:
+                guess = x + (x - previous[1]) * (target - current) / (current - previous[0])
+            else:
+                guess = x
+
+            xnew, stats = solve(guess, target)
+            steps = steps + 1
+            iterations = iterations + stats['iterations']
+            evaluations = evaluations + stats['F evaluations']
+
+            # A failed step is retried with half the step size
+            if xnew is None:
+                step = step / 2
+                if step < minstep * abs(gap):
+                    print("Could not follow the solution past lambda = " + str(current))
+                    return solution, path.table()
+                continue
+
+            previous = (current, x)
+            current = target
+            x = xnew
+            jmat = stats['jacobian']
+
+            # Adapt the step size to how quickly NR converged
+            if stats['iterations'] <= fast:
+                step = 2 * step
+            elif stats['iterations'] > 2 * fast:
+                step = step / 2
+
+        solution[i] = x
+        path.add([lam[i], steps, iterations, evaluations])
+
+    return solution, path.table()
@@ -0,0 +1,114 @@
+# ------------------------------------------------------------------------------------------------------ #
+# Purpose: Script defining ways of making the Newton-Raphson step safe from poor starting points.        #
+# ------------------------------------------------------------------------------------------------------ #
+#
+# The full Newton step x + delta can overshoot, sometimes into a region where F is not even defined (NaN).
+# Both methods below only accept a step that lowers the F norm, so the F norm falls on every iteration.
+#
+# armijo - backtracking line search. Tries x + t*delta for t = 1 and then smaller t, until the F norm
+#          falls by enough (the Armijo condition). Only needs F.
+# dogleg - trust region. Steps to the point, within a given radius of x, that best lowers the linear model
+#          of F along the dogleg path from the steepest descent step to the Newton step. The radius grows
+#          when the model is good and shrinks when it is not. Needs the Jacobian itself.
+
+# Necessary Libraries:
+import numpy as np
+
+
+def armijo(F, x, Fx, delta, c=0.0001, maxsteps=30):
+    # Inputs:
+    # F - a function. Defines the function(s) of the system, length = n.
+    # x - vector. The current point.
+    # Fx - vector. F(x).
+    # delta - vector. The Newton step.
+    # c - optional. How much of the predicted decrease must be reached. Default is 1e-4.
+    # maxsteps - optional. The most step lengths to try. Default is 30.
+
+    # Output:
+    # step - the accepted step, t*delta (None if no step lowered the F norm enough)
+    # Fstep - F at x + step, so it does not need to be evaluated again
+    ###############################################################################
+    f0 = np.dot(Fx, Fx)
+    t = 1.0
+    for i in range(maxsteps):
+        Ft = np.asarray(F(x + t*delta), dtype=float)
+        ft = np.dot(Ft, Ft)
+
+        # Armijo condition on the sum of squares. Along the Newton step its slope at t = 0 is -2*f0.
+        if np.isfinite(ft) and ft <= (1 - 2*c*t) * f0:
+            return t*delta, Ft
+
+        # Shorter step: the minimum of a quadratic through the known values, kept between 0.1*t and 0.5*t.
+        # If F was not finite, just halve it.
+        if np.isfinite(ft):
+            tq = t*t*f0 / (ft - f0 + 2*t*f0)
+            t = min(max(tq, 0.1*t), 0.5*t)
+        else:
+            t = 0.5*t
+    return None, None
+
+
+def doglegstep(delta, g, Jg, radius):
+    # The dogleg step within the radius. delta is the Newton step, g the gradient of 0.5*||F||^2 and Jg the Jacobian times g.
+    if np.linalg.norm(delta) <= radius:
+        return delta
+    gnorm = np.linalg.norm(g)
+    JgJg = np.dot(Jg, Jg)
+    if gnorm == 0 or JgJg == 0:
+        return delta * (radius / np.linalg.norm(delta))
+
+    # Cauchy point: the minimum of the linear model along the steepest descent direction
+    pc = -(gnorm**2 / JgJg) * g
+    if np.linalg.norm(pc) >= radius:
+        return -(radius / gnorm) * g
+
+    # Otherwise go from the Cauchy point towards the Newton step, until the edge of the trust region
+    d = delta - pc
+    a = np.dot(d, d)
+    b = 2 * np.dot(pc, d)
+    c = np.dot(pc, pc) - radius**2
+    tau = (-b + np.sqrt(b**2 - 4*a*c)) / (2*a)
+    return pc + tau*d
+
+
+def dogleg(F, x, Fx, delta, jmat, radius, maxsteps=30):
+    # Inputs:
+    # F - a function. Defines the function(s) of the system, length = n.
+    # x - vector. The current point.
+    # Fx - vector. F(x).
+    # delta - vector. The Newton step.
+    # jmat - the Jacobian matrix at x, dense or scipy.sparse.
+    # radius - numeric. The trust region radius.
+    # maxsteps - optional. The most times the radius is shrunk before giving up. Default is 30.
+
+    # Output:
+    # step - the accepted step (None if no step lowered the F norm)
+    # Fstep - F at x + step, so it does not need to be evaluated again
+    # radius - the trust region radius for the next iteration
+    ###############################################################################
+    f0 = np.dot(Fx, Fx)
+    g = jmat.T.dot(Fx)
+    Jg = jmat.dot(g)
+    for i in range(maxsteps):
+        p = doglegstep(delta, g, Jg, radius)
+        pnorm = np.linalg.norm(p)
+        Fp = np.asarray(F(x + p), dtype=float)
+        fp = np.dot(Fp, Fp)
+
+        # Compare the actual decrease in the sum of squares with the decrease the linear model predicts
+        model = Fx + jmat.dot(p)
+        predicted = f0 - np.dot(model, model)
+        if np.isfinite(fp) and predicted > 0:
+            rho = (f0 - fp) / predicted
+        else:
+            rho = -1
+
+        # Shrink the radius when the model was poor, grow it when it was good and the step reached the edge
+        if rho < 0.25:
+            radius = 0.25 * pnorm
+        elif rho > 0.75 and pnorm >= 0.99 * radius:
+            radius = 2 * radius
+
+        if rho > 0.0001:
+            return p, Fp, radius
+    return None, None, radius
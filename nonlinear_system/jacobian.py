@@ -0,0 +1,141 @@
+# ------------------------------------------------------------------------------------------------------ #
+# Purpose: Script defining cheap ways of computing the Jacobian matrix for the Newton-Raphson function.   #
+# ------------------------------------------------------------------------------------------------------ #
+#
+# forward - forward differences. Uses n evaluations of F (plus F(x), which NR already has).
+# central - central differences. Uses 2n evaluations of F, and is more accurate.
+# colored - forward or central differences for a sparse Jacobian with a known sparsity pattern.
+#           Columns that never share a row are perturbed together, so the whole Jacobian only takes
+#           as many evaluations of F as there are column groups (often a handful), and is returned as a sparse matrix.
+# factor - LU factorization of a dense or sparse Jacobian, so it can be reused for several solves.
+
+# Necessary Libraries:
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+from coloring import greedycolor
+
+# Machine precision, used to choose the step sizes
+eps = np.finfo(float).eps
+
+
+def steps(x, central=False):
+    # Step size for each variable: about sqrt(eps) for forward differences and eps**(1/3) for central differences,
+    # scaled by the size of the variable.
+    if central:
+        return eps**(1/3) * np.maximum(abs(x), 1)
+    return np.sqrt(eps) * np.maximum(abs(x), 1)
+
+
+def forward(F, x, Fx=None):
+    # Inputs:
+    # F - a function. Defines the function(s) of the system, length = n.
+    # x - vector. The point at which to compute the Jacobian.
+    # Fx - optional. F(x), if it is already known.
+
+    # Output:
+    # jac - the (n x n) Jacobian matrix
+    ###############################################################################
+    x = np.asarray(x, dtype=float)
+    if Fx is None:
+        Fx = np.asarray(F(x), dtype=float)
+    h = steps(x)
+    jac = np.zeros((len(Fx), len(x)))
+    for j in range(len(x)):
+        xh = x.copy()
+        xh[j] = xh[j] + h[j]
+        jac[:, j] = (np.asarray(F(xh), dtype=float) - Fx) / h[j]
+    return jac
+
+
+def central(F, x, Fx=None):
+    # Inputs:
+    # F - a function. Defines the function(s) of the system, length = n.
+    # x - vector. The point at which to compute the Jacobian.
+    # Fx - optional. Not used, accepted so that all the strategies take the same arguments.
+
+    # Output:
+    # jac - the (n x n) Jacobian matrix
+    ###############################################################################
+    x = np.asarray(x, dtype=float)
+    h = steps(x, central=True)
+    jac = None
+    for j in range(len(x)):
+        xp = x.copy()
+        xm = x.copy()
+        xp[j] = xp[j] + h[j]
+        xm[j] = xm[j] - h[j]
+        column = (np.asarray(F(xp), dtype=float) - np.asarray(F(xm), dtype=float)) / (2 * h[j])
+        if jac is None:
+            jac = np.zeros((len(column), len(x)))
+        jac[:, j] = column
+    return jac
+
+
+def colorcolumns(pattern):
+    # Inputs:
+    # pattern - the sparsity pattern of the Jacobian: any matrix that is nonzero where the Jacobian can be nonzero.
+
+    # Output:
+    # groups - a list of vectors of column numbers. No two columns in a group have a nonzero in the same row.
+    ###############################################################################
+    pattern = scipy.sparse.csc_matrix(pattern != 0, dtype=float)
+
+    # Two columns conflict when they share a row
+    conflicts = pattern.T.dot(pattern)
+
+    # Each column gets the smallest color not used by a conflicting column
+    colors = greedycolor(conflicts)
+
+    return [np.flatnonzero(colors == c) for c in range(colors.max() + 1)]
+
+
+def colored(F, x, Fx=None, pattern=None, groups=None, central=False):
+    # Inputs:
+    # F - a function. Defines the function(s) of the system, length = n.
+    # x - vector. The point at which to compute the Jacobian.
+    # Fx - optional. F(x), if it is already known (only used for forward differences).
+    # pattern - the sparsity pattern of the Jacobian.
+    # groups - optional. The column groups from colorcolumns(pattern), so they are not recomputed on every call.
+    # central - optional. If True, use central differences. Default is False.
+
+    # Output:
+    # jac - the (n x n) Jacobian matrix, as a scipy.sparse CSR matrix
+    ###############################################################################
+    x = np.asarray(x, dtype=float)
+    pattern = scipy.sparse.coo_matrix(pattern != 0)
+    if groups is None:
+        groups = colorcolumns(pattern)
+    if Fx is None and not central:
+        Fx = np.asarray(F(x), dtype=float)
+    h = steps(x, central)
+
+    # Perturb every column of a group at once. Because they never share a row, the change in each row
+    # of F comes from exactly one column of the group.
+    values = np.zeros(pattern.nnz)
+    for group in groups:
+        e = np.zeros(len(x))
+        e[group] = h[group]
+        if central:
+            dF = (np.asarray(F(x + e), dtype=float) - np.asarray(F(x - e), dtype=float)) / 2
+        else:
+            dF = np.asarray(F(x + e), dtype=float) - Fx
+        # Pick out the entries of the pattern that belong to this group
+        ingroup = np.isin(pattern.col, group)
+        values[ingroup] = dF[pattern.row[ingroup]] / h[pattern.col[ingroup]]
+
+    return scipy.sparse.csr_matrix((values, (pattern.row, pattern.col)), shape=pattern.shape)
+
+
+def factor(jmat):
+    # Inputs:
+    # jmat - the Jacobian matrix, dense or scipy.sparse.
+
+    # Output:
+    # solve - a function that returns the solution y of jmat * y = b for a given b, using the LU factors of jmat
+    ###############################################################################
+    if scipy.sparse.issparse(jmat):
+        return scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(jmat)).solve
+    lu = scipy.linalg.lu_factor(jmat, check_finite=False)
+    return lambda b: scipy.linalg.lu_solve(lu, b, check_finite=False)
@@ -4,7 +4,12 @@
 # ------------------------------------------------------------------------------------------------------ #
 
 # necessary libraries:
+import os
+import sys
 import numpy as np
+
+# The modules shared by every folder are kept in ../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
 from newtonraphson import * 
 
 
@@ -6,50 +6,159 @@
 # Necessary Libraries:
 import numpy as np
 import numdifftools as nd
-import pandas as pd
+import jacobian
+import globalization
+import instrument
+import memo
+from history import History
 
 # Define NR (Newton-Raphson) function
-def NR(F, x, tol = 0.000001, maxiter = 50):
+def NR(F, x, tol = 0.000001, maxiter = 50, history = True, callback = None, jac = None, sparsity = None,
+       mode = 'newton', stall = 0.5, stats = None, globalize = None, radius = None, cache = False):
     # Newton - Raphson Algorithm 
     # Inputs:
     # F - a function. Defines the function(s) of the system, length = n.
     # x - list/array. initial guess for variables. length = n
     # tol - numeric. The error tolerance level. Default is 1e-6
     # maxiter - numeric. Number of maximum iterations to run algorithm. Default is 50.
+    # history - optional. True returns the iteration table as a data frame (default). False records nothing.
+    #           A History object (see history.py) is cleared and filled in and returned instead of a data frame.
+    # callback - optional. A function that receives each row [iteration, F norm, D norm, X_0, ...] as it is computed.
+    # jac - optional. How the Jacobian is computed (see jacobian.py):
+    #       None - numdifftools (default). Accurate, but costs many evaluations of F.
+    #       a function - an analytic Jacobian, called as jac(x). It may return a dense or scipy.sparse matrix.
+    #       'forward' - forward differences, n evaluations of F.
+    #       'central' - central differences, 2n evaluations of F.
+    # sparsity - optional. The sparsity pattern of the Jacobian. With 'forward' or 'central', columns that never share
+    #            a row are perturbed together, which takes only a handful of evaluations, and the Jacobian is sparse.
+    # When the Jacobian is sparse, delta is found with a sparse linear solve.
+    # mode - optional. How often the Jacobian is computed and factored:
+    #        'newton' - on every iteration (default).
+    #        'chord' - once, and then reused until the F norm stops falling fast enough (see stall).
+    #        'broyden' - once, and then kept up to date with a cheap rank-one (Broyden) update of its inverse.
+    #                    Like 'chord', it is computed again when the F norm stalls. The inverse is a dense (n x n) matrix.
+    # stall - optional. For 'chord' and 'broyden', the Jacobian is computed again when the F norm falls by less than
+    #         this factor in one iteration. Default is 0.5.
+    # globalize - optional. Makes sure the F norm falls on every iteration, which helps from poor starting points
+    #             (see globalization.py):
+    #             None - always take the full Newton step (default).
+    #             'armijo' - backtracking line search along the Newton step.
+    #             'dogleg' - dogleg trust region. Not available with mode = 'broyden', which has no Jacobian to use.
+    # radius - optional. The starting trust region radius for 'dogleg'. Default is the length of the first Newton step.
+    # cache - optional. If True, values of F are remembered, so F is not evaluated twice at the same x (see memo.py).
+    #         A number sets how many are kept. Default is False.
+    # stats - optional. A dictionary that is filled in with the number of evaluations of F ('F evaluations'),
+    #         Jacobians computed ('jacobians') and factorizations ('factorizations'), the number of iterations
+    #         ('iterations'), and the last Jacobian computed ('jacobian').
 
     # Output:
     # solution - vector of length n which solves the system
-    # nrout - data frame with information on norms and iteration number.
+    # nrout - data frame with information on norms and iteration number (or the History object, or None).
     ###############################################################################
 
     # Generate a dummy variable equal to zero. Dummy will be set to 1 if a solution is found.
     sol_found = 0
 
-    # Create a base array to append results to
-    results = np.zeros(len(x)+3)
+    # Create a table, sized to maxiter, to store results to
+    names = ["Iteration #", "F norm", "D norm"] + ['X_'+str(i) for i in range(len(x))]
+    if isinstance(history, History):
+        results = history
+        results.reset(callback)
+    else:
+        results = History(maxiter, names, record=history, callback=callback)
+
+    # Count evaluations of F, Jacobians and factorizations.
+    # With instrumentation on (see instrument.py), the calls to F and each phase are timed too.
+    counts = {'F evaluations': 0, 'jacobians': 0, 'factorizations': 0}
+    probe = instrument.start('NR')
+    timed = F
+    if probe is not None:
+        timed = probe.wrap(F)
+    def Fcounted(x):
+        counts['F evaluations'] += 1
+        return timed(x)
+
+    # Remember the values of F, if asked to. Only real evaluations of F are counted.
+    # The solver calls F through Feval from here on.
+    Feval = memo.wrap(Fcounted, cache)
+
+    if globalize == 'dogleg' and mode == 'broyden':
+        raise ValueError("The dogleg trust region needs the Jacobian, so it can not be used with mode = 'broyden'")
+
+    # F at the next x, when a line search or trust region step has already computed it
+    Fnext = None
+    forcerefresh = False
+
+    # With a sparsity pattern, group the columns of the Jacobian once, up front
+    if sparsity is not None:
+        groups = jacobian.colorcolumns(sparsity)
 
     # Loop for Newton-Raphson Algorithm
     for iteration in range(1, maxiter + 1):
 
         # Step 2: Evaluate function at x, called Fval, and its Euclidean norm
-        Fval = F(x)
+        if Fnext is None:
+            Fval = Feval(x)
+        else:
+            Fval = Fnext
         fnorm = np.linalg.norm(Fval, ord=2) # ord = 2 for Euclidean norm
+        if probe is not None:
+            probe.lap('residual')
+
+        # Step 3: Compute the Jacobian Matrix. With 'chord' and 'broyden', only on the first iteration,
+        # or when the F norm has not fallen by the stall factor since the last iteration.
+        refresh = mode == 'newton' or iteration == 1 or forcerefresh or not fnorm <= stall * fnorm_prev
+        forcerefresh = False
+        if refresh:
+            if jac is None:
+                jmat = nd.Jacobian(Feval)(x)
+            elif callable(jac):
+                jmat = jac(x)
+            elif sparsity is not None:
+                jmat = jacobian.colored(Feval, x, Fval, sparsity, groups, central=(jac == 'central'))
+            elif jac == 'forward':
+                jmat = jacobian.forward(Feval, x, Fval)
+            elif jac == 'central':
+                jmat = jacobian.central(Feval, x, Fval)
+            else:
+                raise ValueError("Unknown Jacobian method: " + str(jac))
+            counts['jacobians'] += 1
 
-        # Step 3: Compute the Jacobian Matrix
-        jac = nd.Jacobian(F)(x)
+            # Factor the Jacobian, so it can be reused. Broyden keeps the inverse itself.
+            solve = jacobian.factor(jmat)
+            counts['factorizations'] += 1
+            if mode == 'broyden':
+                jinv = solve(np.eye(len(Fval)))
+        elif mode == 'broyden':
+            # Broyden update: change the inverse Jacobian just enough that it maps the last change in F to the last step
+            dx = step
+            dF = Fval - Fprev
+            HdF = np.dot(jinv, dF)
+            jinv = jinv + np.outer(dx - HdF, np.dot(dx, jinv)) / np.dot(dx, HdF)
+        if probe is not None:
+            probe.lap('jacobian')
 
         # Step 4: Solve for delta
-        delta = np.linalg.solve(jac, -1*Fval)
+        if mode == 'broyden':
+            delta = -1*np.dot(jinv, Fval)
+        else:
+            delta = solve(-1*Fval)
+        fnorm_prev = fnorm
+        Fprev = Fval
         dnorm = np.linalg.norm(delta, ord = 2) # ord = 2 for Euclidean norm
+        if probe is not None:
+            probe.lap('solve')
 
         # Store iteration results
         row = np.zeros(len(x)+3)
         row[0] = iteration
         row[1] = fnorm
         row[2] = dnorm
-        for i in range(len(x)):
-            row[i+3] = x[i]
-        results = np.vstack([results, row])
+        row[3:] = x
+        results.add(row)
+        if probe is not None:
+            probe.lap('history')
+            probe.iterate(fnorm)
 
         # Stopping condition 1: 
         if abs(fnorm) < tol:
@@ -62,21 +171,129 @@ def NR(F, x, tol = 0.000001, maxiter = 50):
             sol_found = 1
             break
         # If neither stopping condition is met, repeat steps 2 - 5 with updated x
-        # Update x
-        x = x + delta
+        # Step 5: Update x. With globalize, the step is shortened until the F norm falls.
+        if globalize is None:
+            step = delta
+        elif globalize == 'armijo':
+            step, Fnext = globalization.armijo(Feval, x, Fval, delta)
+        elif globalize == 'dogleg':
+            if radius is None:
+                radius = dnorm
+            step, Fnext, radius = globalization.dogleg(Feval, x, Fval, delta, jmat, radius)
+        else:
+            raise ValueError("Unknown globalization method: " + str(globalize))
+
+        if step is None:
+            # No step lowered the F norm. An old Jacobian may be to blame, so try again from the same x with a new one.
+            if mode != 'newton' and not refresh:
+                step = np.zeros(len(x))
+                Fnext = Fval
+                forcerefresh = True
+            else:
+                print("The F norm could not be lowered from the current point.")
+                break
+        x = x + step
+        if probe is not None:
+            probe.lap('step')
+
+    if probe is not None:
+        probe.finish()
+    if stats is not None:
+        stats.update(counts)
+        stats['iterations'] = iteration
+        stats['jacobian'] = jmat
 
     if sol_found == 1:
-        iteration_table = pd.DataFrame(results[1:,0:])
-        names1 = np.array(["Iteration #", "F norm", "D norm"])
-        names2 = ['']*len(x)
-        for i in range(len(x)):
-            names2[i] = 'X_'+str(i)
-        names = np.append(names1, names2)
-        iteration_table.columns = names
-
-        return solution, iteration_table
+        if history is True:
+            return solution, results.table()
+        elif history is False:
+            return solution, None
+        return solution, results
     else: 
-        print "Could not find a solution with given parameters."
-        return results
+        print("Could not find a solution with given parameters.")
+        return results.array()
+
+
+# Define NRbatch (batched Newton-Raphson) function
+def NRbatch(F, X, tol = 0.000001, maxiter = 50, params = None, jac = None):
+    # Newton - Raphson Algorithm for many problems with the same structure at once, for example one system
+    # from many starting points, or for many parameter sets. Each iteration solves all the Jacobians together,
+    # and problems drop out as they converge.
+    # Inputs:
+    # F - a function, vectorized over rows. Called as F(X) (or F(X, P) with params), where X is an (m x n) matrix with
+    #     one point per row. Returns an (m x n) matrix with the system evaluated at each row.
+    # X - (m x n) matrix. One initial guess per row.
+    # tol - numeric. The error tolerance level. Default is 1e-6
+    # maxiter - numeric. Number of maximum iterations to run algorithm. Default is 50.
+    # params - optional. An (m x p) matrix with one parameter set per row, passed on to F (and jac) as P.
+    # jac - optional. A function returning the (m x n x n) stack of Jacobians, called like F.
+    #       Default is forward differences, n vectorized evaluations of F per iteration.
 
+    # Output:
+    # solution - (m x n) matrix. The solution for each row (or the last iterate, for rows that did not converge)
+    # converged - vector of length m. True for the rows where a solution was found.
+    # iterations - vector of length m. The iteration on which each row converged.
+    ###############################################################################
+    X = np.array(X, dtype=float)
+    m, n = X.shape
+    if params is not None:
+        params = np.asarray(params)
+
+    def evaluate(func, Xa, active):
+        # Call F or jac on the active rows only
+        if params is None:
+            return np.asarray(func(Xa), dtype=float)
+        return np.asarray(func(Xa, params[active]), dtype=float)
+
+    converged = np.zeros(m, dtype=bool)
+    iterations = np.zeros(m, dtype=int)
+
+    # Rows that have not converged (or failed) yet
+    active = np.arange(m)
+
+    for iteration in range(1, maxiter + 1):
+        Xa = X[active]
+
+        # Step 2: Evaluate the functions at every active row, and their Euclidean norms
+        Fval = evaluate(F, Xa, active)
+        fnorm = np.linalg.norm(Fval, ord=2, axis=1)
+
+        # Step 3: Compute the stack of Jacobian matrices
+        if jac is None:
+            h = jacobian.steps(Xa)
+            jmat = np.empty((len(active), n, n))
+            for j in range(n):
+                Xh = Xa.copy()
+                Xh[:, j] = Xh[:, j] + h[:, j]
+                jmat[:, :, j] = (evaluate(F, Xh, active) - Fval) / h[:, j, np.newaxis]
+        else:
+            jmat = evaluate(jac, Xa, active)
+
+        # Step 4: Solve for all the deltas at once. If one of the Jacobians is singular, solve them one by one
+        # so the others are not lost, and give up on the singular ones.
+        try:
+            delta = np.linalg.solve(jmat, -Fval[:, :, np.newaxis])[:, :, 0]
+        except np.linalg.LinAlgError:
+            delta = np.full(Fval.shape, np.nan)
+            for k in range(len(active)):
+                try:
+                    delta[k] = np.linalg.solve(jmat[k], -Fval[k])
+                except np.linalg.LinAlgError:
+                    pass
+        dnorm = np.linalg.norm(delta, ord=2, axis=1)
+
+        # Stopping conditions, row by row
+        done = (fnorm < tol) | (dnorm < tol)
+        converged[active[done]] = True
+        iterations[active[done]] = iteration
+
+        # Update x on the rows that are still going, and drop the rows that converged or can not go on
+        going = ~done & np.isfinite(dnorm)
+        X[active[going]] = Xa[going] + delta[going]
+        active = active[going]
+        if len(active) == 0:
+            break
 
+    if not converged.all():
+        print("Could not find a solution for " + str(m - converged.sum()) + " of the " + str(m) + " problems.")
+    return X, converged, iterations